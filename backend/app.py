@@ -1,8 +1,10 @@
 import os
 import logging
+import orjson
 from dotenv import load_dotenv
-from flask import Flask, jsonify
-from flask_cors import CORS
+from quart import Quart, jsonify
+from quart.json.provider import DefaultJSONProvider
+from quart_cors import cors
 # Load environment variables from .env
 load_dotenv()
 
@@ -11,27 +13,41 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
-# Initialize DB (import and call init_db from db.py)
-# This will create the Mongo client and ensure indexes (including TTL) exist.
-try:
-    # db.py should expose init_db() and the `db` client/handle
-    from db import init_db, db as mongo_db  # adjust import path if you moved db.py
-    init_db()
-    logger.info("MongoDB initialized successfully.")
-except Exception as e:
-    # If DB initialization fails, log exception but allow app to start for incremental development.
-    logger.exception("Failed to initialize MongoDB on startup: %s", e)
-    mongo_db = None
+# db.py exposes init_db() and the async `db` handle.
+# The async client connects lazily, so the actual initialization (index creation)
+# runs on the serving event loop in the before_serving hook below.
+from db import init_db, db
+
+mongo_db = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson so `jsonify` serializes in C.
+    Output matches the default provider: keys sorted (`sort_keys`) and datetimes passed
+    through to the default provider's `default` hook, which renders them as HTTP dates
+    ("Thu, 15 Oct 2026 08:00:00 GMT") rather than orjson's ISO-8601.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 def create_app():
     """
-    Flask application factory.
-    Minimal app for now — only DB initialization and a health endpoint.
-    Add route blueprints later when ready.
+    Quart (ASGI) application factory.
+    Handlers are `async def` so slow Gemini / MongoDB I/O does not pin a worker thread.
     """
-    app = Flask(__name__)
-    CORS(app, resources={r"/*": {"origins": "*"}})
-    app.config["JSON_SORT_KEYS"] = False
+    app = Quart(__name__)
+    app = cors(app, allow_origin="*")
+    app.json = OrjsonProvider(app)
 
     from routes.session_routes import bp as session_bp
     from routes.question_routes import bp as question_bp
@@ -41,8 +57,31 @@ def create_app():
     app.register_blueprint(question_bp, url_prefix="/questions")
     app.register_blueprint(interaction_bp, url_prefix="/interaction")
 
+    @app.before_serving
+    async def startup():
+        # Ensure indexes (including TTL) exist.
+        global mongo_db
+        try:
+            await init_db()
+            mongo_db = db
+            logger.info("MongoDB initialized successfully.")
+        except Exception as e:
+            # If DB initialization fails, log exception but allow app to start for incremental development.
+            logger.exception("Failed to initialize MongoDB on startup: %s", e)
+            mongo_db = None
+            return
+
+        # Warm the question deck/cache (and with it the connection pool) so the first
+        # "I'm ready" doesn't pay for loading the bank.
+        from services.session_service import warm_question_cache
+        try:
+            count = await warm_question_cache()
+            logger.info("Warmed question cache with %d questions.", count)
+        except Exception as e:
+            logger.warning("Question cache warmup failed: %s", e)
+
     @app.route("/health", methods=["GET"])
-    def health():
+    async def health():
         # Basic health check: if mongo_db is available, report DB ok
         db_status = "unavailable" if mongo_db is None else "ok"
         return jsonify({
@@ -52,9 +91,12 @@ def create_app():
 
     return app
 
+# ASGI entrypoint, e.g. `uvicorn app:application --workers N`
+application = create_app()
+
 if __name__ == "__main__":
-    # Run app for development
+    # Run app for development only; production runs under Gunicorn + Uvicorn workers
+    # (see gunicorn_conf.py).
     port = int(os.getenv("FLASK_RUN_PORT", "5000"))
 
-    application = create_app()
     application.run(host="0.0.0.0", port=port, debug=True)
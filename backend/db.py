@@ -1,40 +1,99 @@
 # db.py
+import importlib.util
 import os
+import logging
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 load_dotenv()
-from pymongo import MongoClient, ASCENDING
-from pymongo.errors import DuplicateKeyError
+from pymongo import AsyncMongoClient, ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError, OperationFailure
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "interview_practice_db")
 SESSION_TTL_MINUTES = int(os.getenv("SESSION_TTL_MINUTES", "30"))
+EVAL_CACHE_TTL_DAYS = int(os.getenv("EVAL_CACHE_TTL_DAYS", "7"))
 
-client = MongoClient(MONGO_URI)
+logger = logging.getLogger(__name__)
+
+# Connection pool sizing. The app is single-user and runs one event loop per
+# worker, so a small warm pool avoids cold TCP+TLS+auth connects on the hot path
+# (find_one / insert_one) without holding idle connections open on the server.
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "20"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "2"))
+# Wire compression, negotiated with the server in order of preference. Session documents
+# carry the turns history, so compressing them cuts bytes on every session read.
+# zstd needs the pymongo[zstd] extra (the zstandard package); without it PyMongo warns on
+# every client creation, so it is only offered when installed. zlib is always available.
+_ZSTD_AVAILABLE = importlib.util.find_spec("zstandard") is not None
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,zlib" if _ZSTD_AVAILABLE else "zlib")
+
+# Created at import but connects lazily on first use, so it is safe to build before
+# Gunicorn forks workers (preload_app); no I/O may happen on it in the master process.
+client = AsyncMongoClient(
+    MONGO_URI,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxConnecting=4,
+    maxIdleTimeMS=60000,
+    # Fail fast instead of queueing indefinitely when every pooled connection is busy.
+    waitQueueTimeoutMS=2000,
+    connectTimeoutMS=5000,
+    socketTimeoutMS=10000,
+    serverSelectionTimeoutMS=3000,
+    compressors=MONGO_COMPRESSORS,
+)
 db = client[MONGO_DB_NAME]
 
-def init_db():
+# Collection handles, bound once so callers don't re-resolve them per request.
+sessions_col = db.get_collection("sessions")
+questions_col = db.get_collection("questions")
+eval_cache_col = db.get_collection("eval_cache")
+
+async def init_db():
     """
     Ensure collections and indexes exist.
-    - questions: index on topic (optional)
-    - sessions: TTL index on 'ttl_expires_at' to auto-delete sessions
+    - questions: (topic, _id) index
+    - sessions: TTL index on 'ttl_expires_at' to auto-delete sessions,
+      descending 'created_at' index for the latest-session lookup
+    - eval_cache: TTL index on 'created_at'
     """
     # Questions collection:
-    questions = db.get_collection("questions")
-    # ensure index on topic for faster sampling by topic
-    questions.create_index([("topic", ASCENDING)], background=True)
-    questions.create_index([("created_at", ASCENDING)], background=True)
+    questions = questions_col
+    # (topic, _id) serves every lookup by topic and covers topic-filtered id reads
+    # ({"topic": t} projected to _id, or a {$match: {topic}} ahead of {$sample}) without
+    # touching the documents, so it replaces the older single-field topic index.
+    await questions.create_index([("topic", ASCENDING), ("_id", ASCENDING)], background=True)
+    try:
+        await questions.drop_index("topic_1")
+    except OperationFailure:
+        pass
+    await questions.create_index([("created_at", ASCENDING)], background=True)
 
     # Sessions collection:
-    sessions = db.get_collection("sessions")
+    sessions = sessions_col
     # TTL index on ttl_expires_at will remove sessions after the given datetime passes.
     # Note: Create the index once; if it already exists, create_index is idempotent.
-    sessions.create_index([("ttl_expires_at", ASCENDING)], expireAfterSeconds=0, background=True)
-    # Also index last_activity_at (optional) for metrics queries
-    sessions.create_index([("last_activity_at", ASCENDING)], background=True)
+    # The TTL monitor runs every `ttlMonitorSleepSecs` (server param, default 60s), so expiry
+    # is approximate; explicit resets go through delete_all_sessions (a single delete_many).
+    await sessions.create_index([("ttl_expires_at", ASCENDING)], expireAfterSeconds=0, background=True)
+    # Descending created_at index backs the "latest session" lookup (find_one sorted by created_at desc).
+    await sessions.create_index([("created_at", DESCENDING)], background=True)
+    # last_activity_at is never queried; every extra secondary index is more write work on each
+    # touch and on each TTL deletion, so drop the index older deployments created.
+    try:
+        await sessions.drop_index("last_activity_at_1")
+    except OperationFailure:
+        pass
+
+    # Evaluation cache: entries keyed by (question, normalized answer) digest, expired by TTL.
+    await eval_cache_col.create_index(
+        [("created_at", ASCENDING)],
+        expireAfterSeconds=EVAL_CACHE_TTL_DAYS * 24 * 3600,
+        background=True,
+    )
 
     # Optional: uniqueness for question IDs (if you manage your own _id)
     # _id is unique by default in MongoDB, so we don't need to explicitly create a unique index for it.
     # Attempting to do so with unique=True can cause an OperationFailure.
 
-    print(f"[db] Initialized DB '{MONGO_DB_NAME}'. Session TTL = {SESSION_TTL_MINUTES} minutes")
+    logger.info("Initialized DB '%s'. Session TTL = %s minutes", MONGO_DB_NAME, SESSION_TTL_MINUTES)
@@ -0,0 +1,35 @@
+# gunicorn_conf.py
+"""
+Production server config: Gunicorn managing Uvicorn (ASGI) workers.
+
+    gunicorn -c gunicorn_conf.py app:application
+
+Each worker runs its own event loop, so a single worker keeps many Gemini / MongoDB
+calls in flight at once.
+
+Run ONE worker (the default). The services keep per-process state that assumes every
+request of the interview reaches the same process: the active session id and its short
+session cache, the prefetched follow-up and next question, and the shuffled question
+deck. With WEB_CONCURRENCY > 1 a prefetched follow-up is wasted whenever the next
+request lands on another worker, each worker deals from its own deck (so questions can
+repeat), and a worker's cached session can be stale for a moment.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Import the app (and parse .env) once in the master, then fork workers from it.
+# This is fork-safe for the Mongo client: AsyncMongoClient opens no sockets or
+# background tasks until its first operation, and init_db() runs in each worker's
+# before_serving hook, so every worker builds its own pool on its own event loop.
+preload_app = True
+
+# LLM calls can take tens of seconds; don't let the arbiter kill a worker mid-request.
+timeout = 120
+graceful_timeout = 30
+keepalive = 30
+
+loglevel = os.getenv("LOG_LEVEL", "INFO").lower()
+accesslog = "-"
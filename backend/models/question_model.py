@@ -1,12 +1,12 @@
 # models/question_model.py
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
 class QuestionModel(BaseModel):
     id: Optional[str] = Field(None, alias="_id")         # you may store a string id like "q_001" or let Mongo generate ObjectId
-    topic: str = Field(..., pattern="^(OOPS|DBMS|OS|CN)$")
-    type: str = Field(..., pattern="^(conceptual|code|design)$")
+    topic: Literal["OOPS", "DBMS", "OS", "CN"]
+    type: Literal["conceptual", "code", "design"]
     prompt: str
     rubric: List[str] = []
     requires_clarification_allowed: bool = True
@@ -1,19 +1,22 @@
 # models/session_model.py
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
-import uuid
+import secrets
 import os
 
 SESSION_TTL_MINUTES = int(os.getenv("SESSION_TTL_MINUTES", "30"))
 
 def gen_id(prefix: str = "session") -> str:
-    return f"{prefix}_{uuid.uuid4().hex[:12]}"
+    return f"{prefix}_{secrets.token_hex(6)}"
+
+def gen_turn_id() -> str:
+    return f"turn_{secrets.token_hex(4)}"
 
 class Turn(BaseModel):
-    turn_id: str = Field(default_factory=lambda: f"turn_{uuid.uuid4().hex[:8]}")
+    turn_id: str = Field(default_factory=gen_turn_id)
     q_id: Optional[str] = None
-    turn_type: str = Field(..., pattern="^(main|followup)$")
+    turn_type: Literal["main", "followup"]
     q_text: Optional[str] = None
     answer_text: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
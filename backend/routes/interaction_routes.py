@@ -1,17 +1,18 @@
 # routes/interaction_routes.py
-from flask import Blueprint, request, jsonify
+from quart import Blueprint, Response, request, jsonify
 import logging
 
-from services.interaction_service import determine_intent_from_user_message
+import orjson
+
+from services.interaction_service import classify_and_evaluate
 from services.session_service import (
-    start_question_for_session,
     route_answer_for_session,
     check_main_answer,
     check_followup_answer,
     handle_positive_ready,
-    generate_final_report_if_ready,  # <-- import final report generator
+    generate_final_report_if_ready,
 )
-from services.clarify_service import clarify_current_question
+from services.clarify_service import clarify_current_question, stream_clarification
 
 logger = logging.getLogger(__name__)
 
@@ -23,20 +24,25 @@ FORBIDDEN_INTENTS = {
 }
 
 @bp.route("/interact", methods=["POST"])
-def interact():
+async def interact():
 
     if not request.is_json:
         return jsonify({"reply": "Invalid request: expected JSON body."}), 400
 
-    data = request.get_json()
+    data = await request.get_json()
     message = (data.get("message") or "").strip()
+    # Clients may opt into Server-Sent Events for LLM-generated replies.
+    wants_stream = bool(data.get("stream")) or request.accept_mimetypes.best == "text/event-stream"
 
     if not message:
         return jsonify({"reply": "Message cannot be empty."}), 400
 
     try:
-        # Determine intent using DB-based session + Gemini intent parser
-        intent = determine_intent_from_user_message(message)
+        # Determine intent using DB-based session + Gemini intent parser.
+        # For answers to an active question the same Gemini call also returns the evaluation.
+        classified = await classify_and_evaluate(message)
+        intent = classified["intent"]
+        evaluation = classified.get("evaluation")
 
         # Forbidden intents (no LLM call)
         if intent in FORBIDDEN_INTENTS:
@@ -55,7 +61,7 @@ def interact():
         # positive_ready → start or generate follow-up / next question
         if intent == "positive_ready":
             try:
-                result = handle_positive_ready()
+                result = await handle_positive_ready()
                 return jsonify(result), 200
             except Exception as e:
                 logger.exception("Failed to handle positive_ready: %s", e)
@@ -63,8 +69,15 @@ def interact():
 
         # clarification request
         if intent == "clarify_question":
+            if wants_stream:
+                async def clarification_events():
+                    async for chunk in stream_clarification(message):
+                        yield f"data: {orjson.dumps({'reply': chunk}).decode()}\n\n"
+                    yield "event: done\ndata: {}\n\n"
+
+                return Response(clarification_events(), mimetype="text/event-stream")
             try:
-                clarification_reply = clarify_current_question(message)
+                clarification_reply = await clarify_current_question(message)
                 return jsonify({"reply": clarification_reply}), 200
             except Exception as e:
                 logger.exception("Clarify service error: %s", e)
@@ -72,15 +85,15 @@ def interact():
 
         # answer handling (main / followup)
         if intent == "answer":
-            routing = route_answer_for_session(message)
+            routing = await route_answer_for_session(message)
             handler = routing.get("handler")
 
             try:
                 if handler == "check_main_answer":
-                    eval_res = check_main_answer(message)
+                    eval_res = await check_main_answer(message, evaluation=evaluation, session=routing["session"])
 
                     # After evaluating a main answer, check if final report is ready
-                    final_report = generate_final_report_if_ready()
+                    final_report = await generate_final_report_if_ready()
                     if final_report:
                         # return the final report as the reply itself
                         return jsonify({"reply": final_report}), 200
@@ -89,10 +102,10 @@ def interact():
                     return jsonify({"reply": "Okay, I have evaluated the answer, shall we move on to the follow up question?"}), 200
 
                 elif handler == "check_followup_answer":
-                    eval_res = check_followup_answer(message)
+                    eval_res = await check_followup_answer(message, evaluation=evaluation, session=routing["session"])
 
                     # After evaluating a follow-up, check and return final report inline if ready
-                    final_report = generate_final_report_if_ready()
+                    final_report = await generate_final_report_if_ready()
                     if final_report:
                         return jsonify({"reply": final_report}), 200
 
@@ -1,12 +1,16 @@
 # routes/question_routes.py
-from flask import Blueprint, jsonify, request
+import logging
+
+from quart import Blueprint, jsonify, request
 from models.question_model import QuestionModel
-from db import db
+from db import questions_col
+
+logger = logging.getLogger(__name__)
 
 bp = Blueprint("question_routes", __name__)
 
 @bp.route("/add", methods=["POST"])
-def add_question():
+async def add_question():
     """
     Add a new question to the database.
 
@@ -14,7 +18,7 @@ def add_question():
     Body:
     {
         "_id": "q_oop_001",   // optional
-        "topic": "OOP",
+        "topic": "OOPS",
         "type": "conceptual",
         "prompt": "Explain polymorphism.",
         "rubric": ["definition", "example", "compile vs runtime"],
@@ -28,13 +32,13 @@ def add_question():
 
     try:
         # Validate request JSON using Pydantic
-        question = QuestionModel(**request.get_json())
+        question = QuestionModel(**(await request.get_json()))
         
         # Convert to bson dict for mongo insertion
         q_doc = question.to_bson()
 
         # Insert into MongoDB
-        result = db.questions.insert_one(q_doc)
+        result = await questions_col.insert_one(q_doc)
 
         # Attach the generated _id for response (if not provided)
         q_doc["_id"] = str(result.inserted_id)
@@ -45,5 +49,5 @@ def add_question():
         }), 201
 
     except Exception as e:
-        print("Error adding question:", e)
+        logger.exception("Error adding question: %s", e)
         return jsonify({"error": "Failed to add question", "details": str(e)}), 500
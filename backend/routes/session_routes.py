@@ -1,19 +1,19 @@
 # routes/session_routes.py
-from flask import Blueprint, jsonify
+from quart import Blueprint, jsonify
 from services.session_service import delete_all_sessions, create_session
 
 bp = Blueprint("session_routes", __name__)
 
 @bp.route("/start", methods=["GET"])
-def start_session():
+async def start_session():
     """
     When frontend loads the website, it should call:
     GET /session/start
 
     This clears all old sessions and starts a fresh one.
     """
-    delete_all_sessions()
-    session_doc = create_session()
+    await delete_all_sessions()
+    session_doc = await create_session()
 
     return jsonify({
         "session_id": session_doc["_id"],
@@ -21,7 +21,7 @@ def start_session():
     }), 200
 
 @bp.route("/delete", methods=["POST", "DELETE"])
-def delete():
+async def delete():
     """
     Delete all sessions immediately.
     POST /session/delete  or DELETE /session/delete
@@ -31,7 +31,7 @@ def delete():
     You may want to protect this endpoint with a simple admin token or remove it in production.
     """
 
-    deleted_count = delete_all_sessions()
+    deleted_count = await delete_all_sessions()
     return jsonify({
         "ok": True,
         "deleted_count": deleted_count,
@@ -1,31 +1,33 @@
 # services/clarify_service.py
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
+import hashlib
 import logging
-import json
 
-from db import db
-from services.gemini_client import call_gemini
+import orjson
+from cachetools import TTLCache
+
+from services.gemini_client import call_gemini, stream_gemini
+from services.session_service import SESSION_CONTEXT_PROJECTION, get_active_session
 
 logger = logging.getLogger(__name__)
 
 # model + generation config
 GEMINI_MODEL = "gemini-2.5-pro"
 
-def _get_single_session_doc() -> Optional[Dict[str, Any]]:
-    col = db.get_collection("sessions")
-    return col.find_one(sort=[("created_at", -1)])
+# Clarifications depend only on the question and the user's wording, so repeats
+# (e.g. "explain this" retyped, or the same question across sessions) are served
+# from memory instead of another Gemini round trip.
+_CLARIFY_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=900)
 
+def _clarify_cache_key(q_id: str, user_query: str) -> bytes:
+    normalized = " ".join(user_query.lower().split())
+    return hashlib.blake2b(f"{q_id}|{normalized}".encode("utf-8"), digest_size=16).digest()
 
-def _build_clarify_prompt(user_query: str, question_text: str, rubric: List[str]) -> str:
-    """
-    Build a prompt instructing Gemini to EXPLAIN the question or a specific part,
-    and to NEVER provide hints, partial solutions, or answers.
-    The prompt includes the local file path (which the deployment will convert to a URL).
-    """
-    rubric_json = json.dumps(rubric or [])
 
-    prompt = f"""
+# Constant prompt fragments, built once at import; only the question, rubric and
+# user query are spliced in per request.
+_CLARIFY_PROMPT_HEAD = """
 You are a careful technical interview assistant whose job is to EXPLAIN the *question text* to the candidate,
 NOT to provide hints, partial solutions, or full answers. Follow these strict rules exactly:
 
@@ -42,42 +44,108 @@ NOT to provide hints, partial solutions, or full answers. Follow these strict ru
 
 Context:
 Question:
-\"\"\"{question_text}\"\"\"
+\"\"\""""
+
+_CLARIFY_PROMPT_RUBRIC = """\"\"\"
 
 Rubric (summary):
-{rubric_json}
+"""
+
+_CLARIFY_PROMPT_QUERY = """
 
 User clarification request:
-\"\"\"{user_query}\"\"\"
+\"\"\""""
+
+_CLARIFY_PROMPT_TAIL = """\"\"\"
 
 Produce a single, focused clarification that follows the rules above. If you must refuse (user asked for answer/hint), respond with the polite refusal described in rule #3.
 """
-    return prompt
 
 
-def clarify_current_question(user_query: str) -> str:
+def _build_clarify_prompt(user_query: str, question_text: str, rubric: List[str]) -> str:
     """
-    Main entrypoint.
-    - If no session or no current question -> return helpful guidance to start interview.
-    - Otherwise call Gemini with the constructed prompt and return the textual reply.
+    Build a prompt instructing Gemini to EXPLAIN the question or a specific part,
+    and to NEVER provide hints, partial solutions, or answers.
+    The prompt includes the local file path (which the deployment will convert to a URL).
     """
-    session = _get_single_session_doc()
+    rubric_json = orjson.dumps(rubric or []).decode()
+
+    return "".join((
+        _CLARIFY_PROMPT_HEAD,
+        question_text,
+        _CLARIFY_PROMPT_RUBRIC,
+        rubric_json,
+        _CLARIFY_PROMPT_QUERY,
+        user_query,
+        _CLARIFY_PROMPT_TAIL,
+    ))
+
+
+async def _prepare_clarification(user_query: str) -> Tuple[Optional[str], Optional[bytes], Optional[str]]:
+    """
+    Resolve the active question for a clarification request.
+    Returns (reply, cache_key, prompt): `reply` is set when no Gemini call is needed
+    (no session / no active question / cache hit); otherwise `prompt` is the one to send.
+    """
+    session = await get_active_session(SESSION_CONTEXT_PROJECTION)
     if not session:
-        return "There is no active interview session. Please start the interview first."
+        return "There is no active interview session. Please start the interview first.", None, None
 
     current_q = session.get("current_question")
     if not current_q:
-        return "No question is currently active. Say 'I'm ready' to start the interview and receive a question."
+        return "No question is currently active. Say 'I'm ready' to start the interview and receive a question.", None, None
 
     question_text = current_q.get("prompt", "")
     rubric = current_q.get("rubric", []) or []
 
+    cache_key = _clarify_cache_key(str(current_q.get("q_id") or question_text), user_query)
+    cached = _CLARIFY_CACHE.get(cache_key)
+    if cached is not None:
+        return cached, cache_key, None
+
     prompt = _build_clarify_prompt(user_query=user_query, question_text=question_text, rubric=rubric)
+    return None, cache_key, prompt
+
+
+async def clarify_current_question(user_query: str) -> str:
+    """
+    Main entrypoint.
+    - If no session or no current question -> return helpful guidance to start interview.
+    - Otherwise call Gemini with the constructed prompt and return the textual reply.
+    """
+    reply, cache_key, prompt = await _prepare_clarification(user_query)
+    if reply is not None:
+        return reply
 
     try:
-        raw_out = call_gemini(prompt=prompt, model=GEMINI_MODEL)
+        raw_out = await call_gemini(prompt=prompt, model=GEMINI_MODEL)
         # raw_out is raw text from Gemini SDK; return stripped result
-        return raw_out.strip() if isinstance(raw_out, str) else str(raw_out)
+        reply = raw_out.strip() if isinstance(raw_out, str) else str(raw_out)
+        _CLARIFY_CACHE[cache_key] = reply
+        return reply
     except Exception as e:
         logger.exception("Clarify call to Gemini failed: %s", e)
         return "Sorry — I couldn't generate a clarification right now. Please try again in a moment."
+
+
+async def stream_clarification(user_query: str) -> AsyncIterator[str]:
+    """
+    Streaming variant of clarify_current_question: yields the clarification text
+    in chunks as Gemini produces it. The complete reply is cached once the stream ends.
+    """
+    reply, cache_key, prompt = await _prepare_clarification(user_query)
+    if reply is not None:
+        yield reply
+        return
+
+    parts: List[str] = []
+    try:
+        async for chunk in stream_gemini(prompt=prompt, model=GEMINI_MODEL):
+            parts.append(chunk)
+            yield chunk
+    except Exception as e:
+        logger.exception("Clarify streaming call to Gemini failed: %s", e)
+        yield "Sorry — I couldn't generate a clarification right now. Please try again in a moment."
+        return
+
+    _CLARIFY_CACHE[cache_key] = "".join(parts).strip()
@@ -1,13 +1,26 @@
 # services/gemini_client.py
 
+import asyncio
 import os
 import logging
+from typing import Any, AsyncIterator, Optional
+import httpx
 from google import genai
+from google.genai import types
 
 logger = logging.getLogger(__name__)
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 
+# Upper bound on Gemini requests in flight per worker, so bursts of concurrent
+# evaluations queue here instead of tripping the API's per-minute rate limits.
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+_gemini_slots = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+# How long an idle Gemini connection is kept open for reuse. Calls come a few seconds
+# apart within an interview, so a warm connection skips the TCP + TLS handshakes.
+GEMINI_KEEPALIVE_S = float(os.getenv("GEMINI_KEEPALIVE_S", "120"))
+
 # Single global client instance
 _client = None
 
@@ -20,29 +33,64 @@ def _get_client():
         raise RuntimeError("GEMINI_API_KEY is not set. Cannot call Gemini API.")
 
     if _client is None:
-        _client = genai.Client(api_key=GEMINI_API_KEY)
+        # One keep-alive pool for every call, with room to keep a connection per slot
+        http = httpx.AsyncClient(limits=httpx.Limits(
+            max_keepalive_connections=GEMINI_MAX_CONCURRENCY,
+            keepalive_expiry=GEMINI_KEEPALIVE_S,
+        ))
+        _client = genai.Client(
+            api_key=GEMINI_API_KEY,
+            http_options=types.HttpOptions(httpx_async_client=http),
+        )
 
     return _client
 
 
-def call_gemini(
+async def call_gemini(
     prompt: str,
     model: str = "gemini-2.5-pro",
-    max_tokens: int = 512,
+    max_tokens: Optional[int] = None,
     temperature: float = 0.0,
+    response_mime_type: Optional[str] = None,
+    response_schema: Optional[Any] = None,
+    thinking_budget: Optional[int] = None,
+    started: Optional[asyncio.Event] = None,
 ) -> str:
     """
-    Calls Google GenAI using the official SDK and returns ONLY the model's text output.
+    Calls Google GenAI using the official SDK's async API and returns ONLY the model's text output.
+    Awaiting the call frees the event loop for other requests during the LLM round trip.
     No fallback, no mock mode, no silent failures.
+
+    max_tokens caps the visible answer (no cap when None). Gemini 2.5 counts thinking
+    tokens against max_output_tokens, so thinking_budget is added on top of it; callers
+    on a thinking model should pass both, or thinking can use up the whole cap and the
+    call returns nothing.
+
+    `started`, when given, is set once the call holds a concurrency slot and the request
+    is on its way, so callers timing the call can leave out the wait for a slot.
     """
 
     client = _get_client()
 
+    config = types.GenerateContentConfig(
+        temperature=temperature,
+        response_mime_type=response_mime_type,
+        response_schema=response_schema,
+    )
+    if thinking_budget is not None:
+        config.thinking_config = types.ThinkingConfig(thinking_budget=thinking_budget)
+    if max_tokens is not None:
+        config.max_output_tokens = max_tokens + (thinking_budget or 0)
+
     try:
-        response = client.models.generate_content(
-            model=model,
-            contents=prompt
-        )
+        async with _gemini_slots:
+            if started is not None:
+                started.set()
+            response = await client.aio.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=config,
+            )
 
         if hasattr(response, "text"):
             return response.text
@@ -52,3 +100,57 @@ def call_gemini(
     except Exception as e:
         logger.exception("Gemini API call failed: %s", e)
         raise RuntimeError(f"Gemini API call failed: {e}")
+
+
+async def stream_gemini(
+    prompt: str,
+    model: str = "gemini-2.5-pro",
+    temperature: Optional[float] = None,
+    response_mime_type: Optional[str] = None,
+    response_schema: Optional[Any] = None,
+    max_tokens: Optional[int] = None,
+    thinking_budget: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """
+    Streams the model's text output chunk by chunk as Gemini produces it,
+    so callers can forward the first tokens before the full response is done.
+    max_tokens and thinking_budget work as in call_gemini.
+    Raises RuntimeError if the stream cannot be opened or breaks mid-way.
+    """
+
+    client = _get_client()
+
+    config = types.GenerateContentConfig(
+        temperature=temperature,
+        response_mime_type=response_mime_type,
+        response_schema=response_schema,
+    )
+    if thinking_budget is not None:
+        config.thinking_config = types.ThinkingConfig(thinking_budget=thinking_budget)
+    if max_tokens is not None:
+        config.max_output_tokens = max_tokens + (thinking_budget or 0)
+
+    try:
+        async with _gemini_slots:
+            stream = await client.aio.models.generate_content_stream(
+                model=model,
+                contents=prompt,
+                config=config,
+            )
+
+            # A caller that stops early closes this generator at the yield; close the SDK
+            # stream too, so its HTTP response is released along with the slot instead of
+            # lingering until garbage collection.
+            try:
+                async for chunk in stream:
+                    text = getattr(chunk, "text", None)
+                    if text:
+                        yield text
+            finally:
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+    except Exception as e:
+        logger.exception("Gemini streaming call failed: %s", e)
+        raise RuntimeError(f"Gemini streaming call failed: {e}")
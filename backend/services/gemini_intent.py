@@ -1,15 +1,21 @@
 # services/gemini_intent.py
 
-from typing import List, Optional, Dict, Any
-import json
+from typing import Awaitable, List, Optional, Dict, Any
+import asyncio
+import hashlib
 import logging
+import re
+import sys
+
+from cachetools import TTLCache
 
 from services.gemini_client import call_gemini
+from services.llm_utils import PROMPT_ESCAPE, extract_json_object, rubric_to_json, split_template
 
 logger = logging.getLogger(__name__)
 
 # Allowed intents
-ALLOWED_INTENTS = {
+ALLOWED_INTENTS = frozenset(map(sys.intern, (
     "clarify_question",
     "request_solution",
     "ask_if_correct",
@@ -19,12 +25,62 @@ ALLOWED_INTENTS = {
     "skip_question",
     "off_topic",
     "other",
-}
+)))
 
-# Use a VALID Gemini SDK model
-GEMINI_MODEL = "gemini-2.5-pro"
-INTENT_MAX_TOKENS = 512
+# Classification is a one-word decision: the fast model with thinking off and a tight
+# output cap, constrained to the JSON schema below.
+GEMINI_MODEL = "gemini-2.5-flash"
+INTENT_MAX_TOKENS = 48
+INTENT_THINKING_BUDGET = 0
+INTENT_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "intent": {"type": "STRING", "enum": sorted(ALLOWED_INTENTS)},
+        "intent_confidence": {"type": "NUMBER"},
+    },
+    "required": ["intent", "intent_confidence"],
+}
 RETRY_ON_FAILURE = True
+# Send the prompt a second time if the first attempt is still running this long after it
+# got a Gemini slot.
+INTENT_HEDGE_DELAY_S = 3.0
+
+# Parsed classifier output keyed by SHA-1 of the rendered prompt; identical
+# (message, question, rubric, summary, turn_type) tuples skip the Gemini call.
+_INTENT_CACHE: TTLCache = TTLCache(maxsize=2048, ttl=600)
+
+# Classifications currently in flight, keyed like _INTENT_CACHE. Concurrent identical
+# requests (double-submits, several tabs) await the same Gemini call instead of each
+# starting their own.
+_INFLIGHT: Dict[str, "asyncio.Task[Optional[Dict[str, Any]]]"] = {}
+
+# Intro turns only resolve to positive_ready or off_topic, so bare yes/no replies are
+# decided locally. Both patterns must match the WHOLE message; anything longer ("ok I have
+# a question first") or containing a negation ("not sure I want to start") goes to Gemini.
+_INTRO_READY_RE = re.compile(
+    r"(?:(?:yes|yeah|yep|sure|ok|okay)[,.!]?\s*)*"
+    r"(?:(?:i'?m |i am )?ready|let'?s (?:go|start|begin)|start|begin|go ahead)?"
+    r"(?:\s+please)?\s*[.!]*",
+    re.IGNORECASE,
+)
+_INTRO_NOT_READY_RE = re.compile(
+    r"(?:no|nope|wait|hold on|not (?:yet|now)|(?:i'?m |i am )?not ready(?: yet)?)"
+    r"(?:[,.!]?\s*(?:sorry|thanks|thank you))?\s*[.!]*",
+    re.IGNORECASE,
+)
+_NEGATION_RE = re.compile(r"\b(?:no|not|never|cannot)\b|n't\b", re.IGNORECASE)
+
+
+def _intro_prefilter(user_message: str) -> Optional[str]:
+    """positive_ready / off_topic for a bare acknowledgment or decline, else None."""
+    text = (user_message or "").strip().replace("\u2019", "'")
+    if not any(ch.isalpha() for ch in text):
+        return None
+    if _INTRO_NOT_READY_RE.fullmatch(text):
+        return "off_topic"
+    if _INTRO_READY_RE.fullmatch(text) and not _NEGATION_RE.search(text):
+        return "positive_ready"
+    return None
 
 # Strict JSON-only prompt
 INTENT_PROMPT_TEMPLATE = """
@@ -37,10 +93,7 @@ Schema:
   "intent": "one of: clarify_question | request_solution | ask_if_correct |
              answer | positive_ready | negative_ready |
              skip_question | off_topic | other",
-  "intent_confidence": 0.0,
-  "clarify_target": "",
-  "answer_text": "",
-  "notes": ""
+  "intent_confidence": 0.0
 }}
 
 RULES:
@@ -58,40 +111,32 @@ User message:
 "{user_message}"
 """
 
+# Split the template once at import into its constant fragments (with {{ }} already
+# unescaped), so building a prompt is a plain join instead of str.format parsing.
+_PROMPT_FIELDS = ("turn_type", "question", "rubric_json", "summary", "user_message")
+(
+    _P_HEAD, _P_QUESTION, _P_RUBRIC, _P_SUMMARY, _P_MESSAGE, _P_TAIL
+) = split_template(INTENT_PROMPT_TEMPLATE, _PROMPT_FIELDS)
+
 def _build_prompt(user_message: str, question: str,
                   rubric: List[str], summary: str, turn_type: str) -> str:
 
-    safe_question = (question or "").replace("\n", " ").replace('"', '\\"')
-    safe_msg = (user_message or "").replace("\n", " ").replace('"', '\\"')
-    safe_summary = (summary or "").replace("\n", " ").replace('"', '\\"')
-    rubric_json = json.dumps(rubric or [])
-
-    return INTENT_PROMPT_TEMPLATE.format(
-        turn_type=turn_type,
-        question=safe_question,
-        rubric_json=rubric_json,
-        summary=safe_summary,
-        user_message=safe_msg
-    )
+    safe_question = (question or "").translate(PROMPT_ESCAPE)
+    safe_msg = (user_message or "").translate(PROMPT_ESCAPE)
+    safe_summary = (summary or "").translate(PROMPT_ESCAPE)
+    rubric_json = rubric_to_json(rubric)
 
+    return "".join((
+        _P_HEAD, turn_type,
+        _P_QUESTION, safe_question,
+        _P_RUBRIC, rubric_json,
+        _P_SUMMARY, safe_summary,
+        _P_MESSAGE, safe_msg,
+        _P_TAIL,
+    ))
 
-def _extract_json_from_raw(raw: str) -> Dict[str, Any]:
-    """Parse JSON strictly from model output."""
-    try:
-        return json.loads(raw)
-    except Exception:
-        # Try extracting substring
-        start = raw.find("{")
-        end = raw.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            try:
-                return json.loads(raw[start:end+1])
-            except Exception as e:
-                raise ValueError(f"Could not parse JSON substring: {e}") from e
-        raise ValueError("No JSON object found in raw output")
-
-
-def gemini_intent(
+
+async def gemini_intent(
     user_message: str,
     question: str = "",
     rubric: Optional[List[str]] = None,
@@ -99,48 +144,30 @@ def gemini_intent(
     turn_type: str = "main"
 ) -> str:
 
+    if turn_type == "intro":
+        quick = _intro_prefilter(user_message)
+        if quick is not None:
+            return quick
+
     rubric = rubric or []
     prompt = _build_prompt(user_message, question, rubric, session_summary, turn_type)
+    prompt_hash = hashlib.sha1(prompt.encode("utf-8")).hexdigest()
 
-    # === FIRST CALL ===
-    try:
-        raw = call_gemini(
-            prompt=prompt,
-            model=GEMINI_MODEL,
-            max_tokens=INTENT_MAX_TOKENS
-        )
-    except Exception:
-        if turn_type == "intro":
-            return "off_topic"
-        return "other"
-
-    # === FIRST PARSE ATTEMPT ===
-    try:
-        parsed = _extract_json_from_raw(raw)
-    except Exception:
-        if not RETRY_ON_FAILURE:
-            return "off_topic" if turn_type == "intro" else "other"
-
-        # === SECOND CALL ===
-        try:
-            retry_prompt = (
-                prompt
-                + "\n\nThe previous output was invalid. Return ONLY valid JSON matching the schema."
-            )
-            raw2 = call_gemini(
-                prompt=retry_prompt,
-                model=GEMINI_MODEL,
-                max_tokens=INTENT_MAX_TOKENS
-            )
-            parsed = _extract_json_from_raw(raw2)
-        except Exception:
+    parsed = _INTENT_CACHE.get(prompt_hash)
+    if parsed is None:
+        parsed = await _classify_coalesced(prompt_hash, prompt)
+        if parsed is None:
             return "off_topic" if turn_type == "intro" else "other"
+        _INTENT_CACHE[prompt_hash] = parsed
 
     # === VALIDATION ===
     intent = parsed.get("intent")
     confidence = parsed.get("intent_confidence", 0.0)
 
-    if not isinstance(intent, str) or intent not in ALLOWED_INTENTS:
+    if not isinstance(intent, str):
+        return "off_topic" if turn_type == "intro" else "other"
+    intent = sys.intern(intent)
+    if intent not in ALLOWED_INTENTS:
         return "off_topic" if turn_type == "intro" else "other"
 
     if turn_type == "intro":
@@ -152,3 +179,81 @@ def gemini_intent(
         return "off_topic"
 
     return intent
+
+
+async def _classify_coalesced(prompt_hash: str, prompt: str) -> Optional[Dict[str, Any]]:
+    task = _INFLIGHT.get(prompt_hash)
+    if task is None:
+        task = asyncio.create_task(_classify_prompt(prompt))
+        _INFLIGHT[prompt_hash] = task
+        task.add_done_callback(lambda _t: _INFLIGHT.pop(prompt_hash, None))
+    # shield: one caller disconnecting must not cancel the call the others are awaiting
+    return await asyncio.shield(task)
+
+
+def _parse_intent_output(raw: str) -> Dict[str, Any]:
+    parsed = extract_json_object(raw)
+    if not isinstance(parsed, dict):
+        raise ValueError("Intent output is not a JSON object")
+    return parsed
+
+
+def _call_intent_model(prompt: str, started: Optional[asyncio.Event] = None) -> Awaitable[str]:
+    return call_gemini(
+        prompt=prompt,
+        model=GEMINI_MODEL,
+        max_tokens=INTENT_MAX_TOKENS,
+        response_mime_type="application/json",
+        response_schema=INTENT_RESPONSE_SCHEMA,
+        thinking_budget=INTENT_THINKING_BUDGET,
+        started=started,
+    )
+
+
+async def _classify_prompt(prompt: str) -> Optional[Dict[str, Any]]:
+    """
+    Call Gemini with the rendered intent prompt and return the parsed JSON object,
+    or None if no valid JSON was obtained.
+
+    If the first call is still running INTENT_HEDGE_DELAY_S after it got a Gemini slot
+    (time spent queueing for a slot doesn't count), the same prompt is sent again and
+    whichever valid response arrives first wins. As before, a call that raised is not
+    retried, and output that doesn't parse is retried once with the stricter prompt.
+    """
+    retry_prompt = (
+        prompt
+        + "\n\nThe previous output was invalid. Return ONLY valid JSON matching the schema."
+    )
+
+    first_started = asyncio.Event()
+    pending = {asyncio.create_task(_call_intent_model(prompt, first_started))}
+    retried = False
+    invalid = False
+    try:
+        slot_wait = asyncio.create_task(first_started.wait())
+        await asyncio.wait(pending | {slot_wait}, return_when=asyncio.FIRST_COMPLETED)
+        slot_wait.cancel()
+        if first_started.is_set():
+            done, _ = await asyncio.wait(pending, timeout=INTENT_HEDGE_DELAY_S)
+            if not done:
+                pending.add(asyncio.create_task(_call_intent_model(prompt)))
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    logger.debug("Intent classification call failed: %s", task.exception())
+                    continue
+                try:
+                    return _parse_intent_output(task.result())
+                except Exception as e:
+                    logger.debug("Invalid intent classification output: %s", e)
+                    invalid = True
+
+            if not pending and invalid and RETRY_ON_FAILURE and not retried:
+                pending = {asyncio.create_task(_call_intent_model(retry_prompt))}
+                retried = True
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
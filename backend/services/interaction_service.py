@@ -6,17 +6,77 @@ determine the user's intent given a message. Returns only the intent string.
 
 from typing import Dict, Any, List, Optional
 import logging
+import re
+import sys
 
-from db import db
-from services.gemini_intent import gemini_intent
+from services.gemini_client import stream_gemini
+from services.gemini_intent import INTENT_MAX_TOKENS, gemini_intent, ALLOWED_INTENTS
+from services.llm_utils import PROMPT_ESCAPE, extract_json_object, normalize_evaluation, rubric_to_json, split_template
+from services.session_service import (
+    EVAL_MAX_TOKENS,
+    EVAL_THINKING_BUDGET,
+    SESSION_CONTEXT_PROJECTION,
+    cached_evaluation,
+    get_active_session,
+    non_answer_evaluation,
+    prefetch_followup,
+    remember_evaluation,
+)
 
 logger = logging.getLogger(__name__)
 
+# Cheap deterministic classifier for short, unambiguous messages. Patterns must match the
+# WHOLE message, so an answer that merely contains "explain" or "ready" still goes to Gemini.
+# positive_ready is only taken while no question is awaiting an answer: "yes" / "sure" in
+# reply to "Is TCP connection-oriented?" is an answer to grade.
+_ACK = r"(?:(?:yes|yeah|yep|sure|ok|okay)[,.!]?\s+)?"
+_END = r"(?:\s+please)?\s*[.!?]*"
+_QUICK_INTENT_PATTERNS = {
+    "positive_ready": re.compile(
+        _ACK + r"(?:yes|yeah|yep|sure|ok|okay|ready|i'?m ready|i am ready|i'?m set|"
+        r"let'?s (?:go|start|begin|move on)|start|begin|go ahead|next(?: question)?|move on)" + _END,
+        re.IGNORECASE,
+    ),
+    "clarify_question": re.compile(
+        r"(?:(?:can|could) you\s+)?(?:please\s+)?(?:clarify|explain|rephrase)"
+        r"(?:\s+(?:the|this|that)(?:\s+question)?)?" + _END
+        + r"|what do you mean" + _END,
+        re.IGNORECASE,
+    ),
+    "ask_if_correct": re.compile(
+        r"(?:is (?:that|this|it|my answer) (?:correct|right)|am i (?:correct|right))" + _END,
+        re.IGNORECASE,
+    ),
+    "request_solution": re.compile(
+        r"(?:(?:can|could) you\s+)?(?:please\s+)?(?:give|tell|show) me the (?:answer|solution)" + _END
+        + r"|what(?: is|'s) the (?:answer|solution)" + _END,
+        re.IGNORECASE,
+    ),
+    # Not "pass": it is also a Python statement, so it may well be an answer
+    "skip_question": re.compile(
+        r"(?:(?:can|could) (?:we|i)\s+)?(?:please\s+)?skip(?:\s+(?:it|this|that|the|this question|the question))?" + _END,
+        re.IGNORECASE,
+    ),
+}
 
-def _get_single_session() -> Optional[Dict[str, Any]]:
-    col = db.get_collection("sessions")
-    session = col.find_one(sort=[("created_at", -1)])
-    return session
+
+def _regex_intent(user_message: str, awaiting_answer: bool) -> Optional[str]:
+    """Return an intent for obvious phrasings ("I'm ready", "explain", ...), else None."""
+    text = user_message.strip().replace("\u2019", "'")
+    for intent, pattern in _QUICK_INTENT_PATTERNS.items():
+        if awaiting_answer and intent == "positive_ready":
+            continue
+        if pattern.fullmatch(text):
+            return intent
+    return None
+
+
+def _awaiting_answer(session: Optional[Dict[str, Any]]) -> bool:
+    """True while the current question's turn (the last one) has no answer yet."""
+    if not session or not session.get("current_question"):
+        return False
+    turns = session.get("turns") or []
+    return bool(turns) and not turns[-1].get("answer_text")
 
 
 def _infer_turn_type(session: Optional[Dict[str, Any]]) -> str:
@@ -31,13 +91,189 @@ def _infer_turn_type(session: Optional[Dict[str, Any]]) -> str:
     return "intro"
 
 
-def determine_intent_from_user_message(user_message: str) -> str:
+# Same model and thinking budget as the standalone evaluator, since this call also grades
+# the answer; the output cap leaves room for the two intent fields ahead of the evaluation.
+# Non-answers stop the stream at the intent, so they never use the evaluation share.
+CLASSIFY_AND_EVALUATE_MODEL = "gemini-2.5-pro"
+CLASSIFY_AND_EVALUATE_MAX_TOKENS = EVAL_MAX_TOKENS + INTENT_MAX_TOKENS
+CLASSIFY_AND_EVALUATE_THINKING_BUDGET = EVAL_THINKING_BUDGET
+
+# One prompt that classifies the message AND, when it is an answer, grades it against the
+# rubric, so an answer costs a single Gemini round trip instead of intent + evaluation.
+CLASSIFY_AND_EVALUATE_PROMPT = """
+You are the intent classifier AND answer evaluator for a technical interview assistant.
+
+Return ONLY a valid JSON object with NO text before or after it.
+
+Schema:
+{{
+  "intent": "one of: clarify_question | request_solution | ask_if_correct |
+             answer | positive_ready | negative_ready |
+             skip_question | off_topic | other",
+  "intent_confidence": 0.0,
+  "feedback": "",
+  "classification": "",
+  "confidence": 0.0
+}}
+
+RULES:
+- STRICT JSON ONLY — no comments, no explanations.
+- intent MUST be exactly one of the allowed strings.
+- ONLY when intent is "answer", evaluate the user message as the candidate's answer:
+  - "feedback": a concise critique (what was good, which rubric points are satisfied / missing).
+  - "classification": one of correct | somewhat_correct | wrong
+    (correct = satisfies most rubric points; somewhat_correct = partial/incomplete; wrong = incorrect or irrelevant).
+  - "confidence": your estimate of correctness (0.0 - 1.0).
+- For any other intent omit feedback, classification and confidence.
+- Do NOT provide the solution or step-by-step hints.
+
+Context:
+turn_type: {turn_type}
+question: "{question}"
+rubric: {rubric_json}
+session_summary: "{summary}"
+
+User message:
+"{user_message}"
+"""
+
+(
+    _CE_HEAD, _CE_QUESTION, _CE_RUBRIC, _CE_SUMMARY, _CE_MESSAGE, _CE_TAIL
+) = split_template(CLASSIFY_AND_EVALUATE_PROMPT, ("turn_type", "question", "rubric_json", "summary", "user_message"))
+
+# Graded like the standalone evaluator: temperature 0 and a fixed output shape. "intent"
+# is ordered first so the stream can be cut short once it is known (see below).
+CLASSIFY_AND_EVALUATE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "intent": {"type": "STRING", "enum": sorted(ALLOWED_INTENTS)},
+        "intent_confidence": {"type": "NUMBER"},
+        "feedback": {"type": "STRING"},
+        "classification": {"type": "STRING", "enum": ["correct", "somewhat_correct", "wrong"]},
+        "confidence": {"type": "NUMBER"},
+    },
+    "propertyOrdering": ["intent", "intent_confidence", "feedback", "classification", "confidence"],
+    "required": ["intent", "intent_confidence"],
+}
+
+
+def _build_classify_and_evaluate_prompt(user_message: str, session: Dict[str, Any], turn_type: str) -> str:
+    current_q = session.get("current_question") or {}
+    return "".join((
+        _CE_HEAD, turn_type,
+        _CE_QUESTION, (current_q.get("prompt") or "").translate(PROMPT_ESCAPE),
+        _CE_RUBRIC, rubric_to_json(current_q.get("rubric")),
+        _CE_SUMMARY, (session.get("summary") or "").translate(PROMPT_ESCAPE),
+        _CE_MESSAGE, user_message.translate(PROMPT_ESCAPE),
+        _CE_TAIL,
+    ))
+
+
+# "intent" is the first field of the fused schema; matched on the partial stream output.
+_STREAMED_INTENT_RE = re.compile(r'"intent"\s*:\s*"([a-z_]+)"')
+
+
+async def _stream_classify_and_evaluate(prompt: str, grade: bool = True) -> Dict[str, Any]:
     """
-    Return only the intent string. Uses gemini_intent internally.
+    Run the fused call as a stream and return the parsed JSON object. Once the intent
+    value is complete and it is not "answer" (or `grade` is False), the evaluation fields
+    that follow are unused, so the stream is closed early and {"intent": ...} returned
+    on its own.
     """
-    session = _get_single_session()
+    text = ""
+    intent_seen = False
+    stream = stream_gemini(
+        prompt,
+        model=CLASSIFY_AND_EVALUATE_MODEL,
+        temperature=0.0,
+        response_mime_type="application/json",
+        response_schema=CLASSIFY_AND_EVALUATE_SCHEMA,
+        max_tokens=CLASSIFY_AND_EVALUATE_MAX_TOKENS,
+        thinking_budget=CLASSIFY_AND_EVALUATE_THINKING_BUDGET,
+    )
+    try:
+        async for chunk in stream:
+            text += chunk
+            if not intent_seen:
+                match = _STREAMED_INTENT_RE.search(text)
+                if match:
+                    intent_seen = True
+                    if match.group(1) != "answer" or not grade:
+                        return {"intent": match.group(1)}
+    finally:
+        # Closes the SDK stream and frees the Gemini slot right away on an early return
+        await stream.aclose()
+    return extract_json_object(text)
+
+
+async def classify_and_evaluate(user_message: str) -> Dict[str, Any]:
+    """
+    Return {"intent": str, "evaluation": Optional[dict]}.
+
+    While a question is active, a single Gemini call classifies the message and, if it is
+    an answer, evaluates it; the evaluation can be passed straight to check_main_answer /
+    check_followup_answer. Otherwise (or if the fused call fails) this falls back to the
+    intent-only path and "evaluation" is None.
+    """
+    session = await get_active_session(SESSION_CONTEXT_PROJECTION)
+    awaiting_answer = _awaiting_answer(session)
+    quick = _regex_intent(user_message, awaiting_answer)
+    if quick is not None:
+        return {"intent": quick, "evaluation": None}
+
     turn_type = _infer_turn_type(session)
 
+    if turn_type in ("main", "followup"):
+        # A resubmitted answer is graded from the evaluation caches (memory, then Mongo)
+        # without Gemini; only messages already classified as answers are cached there
+        question_text = (session.get("current_question") or {}).get("prompt", "")
+        if awaiting_answer:
+            evaluation = await cached_evaluation(question_text, user_message)
+            if evaluation is not None:
+                return {"intent": "answer", "evaluation": evaluation}
+
+            # The follow-up only depends on the question, so generate it while this streams
+            if turn_type == "main":
+                prefetch_followup(session.get("current_question") or {})
+
+        # "idk"-style replies still need classifying, but if they turn out to be answers
+        # they get the canned grade, so the stream can stop at the intent
+        canned = non_answer_evaluation(user_message)
+        prompt = _build_classify_and_evaluate_prompt(user_message, session, turn_type)
+        try:
+            parsed = await _stream_classify_and_evaluate(prompt, grade=canned is None)
+            intent = parsed.get("intent")
+            if isinstance(intent, str) and (intent := sys.intern(intent)) in ALLOWED_INTENTS:
+                evaluation = None
+                if intent == "answer":
+                    if canned is not None:
+                        evaluation = canned
+                    elif parsed.get("classification"):
+                        evaluation = normalize_evaluation(parsed)
+                        await remember_evaluation(question_text, user_message, evaluation)
+                return {"intent": intent, "evaluation": evaluation}
+            logger.warning("Fused classify/evaluate returned invalid intent: %s", intent)
+        except Exception as e:
+            logger.warning("Fused classify/evaluate failed, falling back to intent-only: %s", e)
+
+    intent = await _classify_with_session(user_message, session, turn_type)
+    return {"intent": intent, "evaluation": None}
+
+
+async def determine_intent_from_user_message(user_message: str) -> str:
+    """
+    Return only the intent string. Obvious phrasings are resolved locally by
+    _regex_intent; everything else goes through gemini_intent.
+    """
+    session = await get_active_session(SESSION_CONTEXT_PROJECTION)
+    quick = _regex_intent(user_message, _awaiting_answer(session))
+    if quick is not None:
+        return quick
+
+    return await _classify_with_session(user_message, session, _infer_turn_type(session))
+
+
+async def _classify_with_session(user_message: str, session: Optional[Dict[str, Any]], turn_type: str) -> str:
     question_text = ""
     rubric: List[str] = []
     session_summary = ""
@@ -49,7 +285,7 @@ def determine_intent_from_user_message(user_message: str) -> str:
         session_summary = session.get("summary") or ""
 
     # call gemini_intent (this function returns a single intent string)
-    intent = gemini_intent(
+    intent = await gemini_intent(
         user_message=user_message,
         question=question_text,
         rubric=rubric,
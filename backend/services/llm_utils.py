@@ -0,0 +1,130 @@
+# services/llm_utils.py
+"""
+Helpers shared by the services that build Gemini prompts and read its JSON output:
+template splitting, prompt escaping, JSON parsing and evaluation normalization.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import logging
+import string
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+def split_template(template: str, expected_fields: Tuple[str, ...]) -> List[str]:
+    """
+    Split a str.format template into the literal fragments around its fields, with
+    {{ }} escapes resolved, so callers can build the prompt with "".join. The fields
+    must appear exactly in `expected_fields` order.
+    """
+    fragments, current, fields = [], [], []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        current.append(literal)
+        if field is not None:
+            fragments.append("".join(current))
+            fields.append(field)
+            current = []
+    fragments.append("".join(current))
+    assert tuple(fields) == expected_fields, fields
+    return fragments
+
+
+# Flatten newlines and escape quotes in one translate pass per value.
+PROMPT_ESCAPE = str.maketrans({"\n": " ", "\r": " ", '"': '\\"'})
+
+
+def _scan_json_object(raw: str) -> Optional[slice]:
+    """
+    Single pass over `raw` returning the span of the first balanced {...} object,
+    tracking string/escape state so braces inside string values are ignored.
+    """
+    depth = 0
+    start = -1
+    in_string = False
+    escape = False
+    for i, ch in enumerate(raw):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            # quotes only matter inside an object; prose before it is skipped
+            in_string = depth > 0
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                return slice(start, i + 1)
+    return None
+
+
+def loads_json(text: str) -> Any:
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        # stdlib is more lenient (e.g. NaN, lone surrogates)
+        return json.loads(text)
+
+
+def extract_json_object(raw: str) -> Dict[str, Any]:
+    """Parse JSON strictly from model output."""
+    try:
+        return loads_json(raw)
+    except Exception:
+        # Try extracting the first JSON object embedded in surrounding text
+        span = _scan_json_object(raw)
+        if span is not None:
+            try:
+                return loads_json(raw[span])
+            except Exception as e:
+                raise ValueError(f"Could not parse JSON substring: {e}") from e
+        raise ValueError("No JSON object found in raw output")
+
+
+@lru_cache(maxsize=512)
+def _rubric_json(rubric: Tuple[str, ...]) -> str:
+    # Main question and follow-up answers re-send the same rubric; serialize it once.
+    return orjson.dumps(list(rubric)).decode()
+
+
+def rubric_to_json(rubric: Optional[List[str]]) -> str:
+    try:
+        return _rubric_json(tuple(rubric or ()))
+    except TypeError:  # unhashable rubric items
+        return orjson.dumps(rubric or []).decode()
+
+
+def normalize_evaluation(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Coerce a parsed evaluator JSON object into the stored evaluation shape:
+    {"feedback": str, "classification": correct|somewhat_correct|wrong, "confidence": 0.0-1.0}.
+    """
+    feedback = parsed.get("feedback", "").strip() if isinstance(parsed.get("feedback", ""), str) else str(parsed.get("feedback", ""))
+    classification = parsed.get("classification", "")
+    confidence = parsed.get("confidence", 0.0)
+
+    if classification not in ("correct", "somewhat_correct", "wrong"):
+        logger.warning("Unexpected classification from Gemini: %s", classification)
+        classification = "somewhat_correct"
+
+    try:
+        confidence = float(confidence)
+    except Exception:
+        confidence = 0.0
+    confidence = max(0.0, min(1.0, confidence))
+
+    return {
+        "feedback": feedback,
+        "classification": classification,
+        "confidence": confidence
+    }
@@ -1,122 +1,351 @@
 # services/session_service.py
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
-from pymongo.collection import Collection
-from pydantic import ValidationError
+from typing import Optional, Dict, Any, List, Tuple
+from pymongo import ReturnDocument, WriteConcern
+from cachetools import TTLCache
+import asyncio
+import hashlib
 import logging
-import uuid
-import os
-import json
+import random
+import time
+import secrets
 
-from db import db  # expects db to expose the pymongo database handle
-from models.session_model import SessionModel
+from db import SESSION_TTL_MINUTES, sessions_col, questions_col, eval_cache_col  # collection handles, bound once at import
+from models.session_model import gen_id, gen_turn_id
 from services.gemini_client import call_gemini
+from services.llm_utils import loads_json, normalize_evaluation, rubric_to_json, split_template
 
 logger = logging.getLogger(__name__)
 
-# Configurable: how many minutes until session TTL expires (db.py also uses SESSION_TTL_MINUTES env)
-from os import getenv
-SESSION_TTL_MINUTES = int(getenv("SESSION_TTL_MINUTES", "30"))
-
-# --- collection helper ---
-def _sessions_collection() -> Collection:
-    return db.get_collection("sessions")
+# How many minutes until session TTL expires; read once in db.py so both agree.
+_SESSION_TTL = timedelta(minutes=SESSION_TTL_MINUTES)
+
+# Single-user app: remember the active session id so lookups are a primary-key hit
+# instead of a sort over the sessions collection. Set on create, cleared on delete.
+_active_session_id: Optional[str] = None
+
+# Short-lived copy of the active session document. One interaction reads the session
+# several times (classify, then answer/clarify), so within this window those reads
+# skip the Mongo round trip. Every session write resets it via _invalidate_session_cache().
+# "projection" is None for a full document, else the projection it was read with.
+_SESSION_CACHE: Dict[str, Any] = {"doc": None, "ts": 0.0, "projection": None}
+_SESSION_CACHE_TTL_S = 2.0
+
+# Session ids whose TTL this worker extended recently (see _find_and_touch_session);
+# entries expire after the debounce window.
+_TOUCH_DEBOUNCE_S = 60.0
+_TOUCH_DEBOUNCE = timedelta(seconds=_TOUCH_DEBOUNCE_S)
+_RECENT_TOUCHES: TTLCache = TTLCache(maxsize=256, ttl=_TOUCH_DEBOUNCE_S)
+
+# What intent classification, clarification and answer checking read from the session.
+# The turns and questions_asked arrays grow with every question, so these paths fetch
+# only the last turn (the one an answer is recorded on) and skip questions_asked.
+SESSION_CONTEXT_PROJECTION: Dict[str, Any] = {
+    "_id": 1,
+    "current_question": 1,
+    "summary": 1,
+    "turns": {"$slice": -1},
+}
 
 
 # -------------------------
 # Session lifecycle
 # -------------------------
-def create_session(target_role: Optional[str] = None, experience_level: Optional[str] = None) -> Dict[str, Any]:
+async def create_session(target_role: Optional[str] = None, experience_level: Optional[str] = None) -> Dict[str, Any]:
     """
     Create a new session document and insert it into MongoDB.
     Returns the inserted session document as a plain dict (BSON-like).
     """
-    session = SessionModel.new_session(target_role=target_role, experience_level=experience_level)
-    session.ttl_expires_at = datetime.utcnow() + timedelta(minutes=SESSION_TTL_MINUTES)
-    session.last_activity_at = datetime.utcnow()
-    session_doc = session.to_bson()
-    col = _sessions_collection()
-    res = col.insert_one(session_doc)
-    logger.info("Created new session with id=%s (inserted_id=%s)", session_doc.get("_id"), res.inserted_id)
+    session_doc = _new_session_doc(datetime.utcnow(), target_role=target_role, experience_level=experience_level)
+    _invalidate_session_cache()
+    res = await sessions_col.insert_one(session_doc)
+    _remember_active_session(session_doc.get("_id"))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Created new session with id=%s (inserted_id=%s)", session_doc.get("_id"), res.inserted_id)
     return session_doc
 
 
-def delete_all_sessions() -> int:
-    col = _sessions_collection()
-    result = col.delete_many({})
-    logger.info("Deleted %d sessions from sessions collection.", result.deleted_count)
+async def delete_all_sessions() -> int:
+    _invalidate_session_cache()
+    result = await sessions_col.delete_many({})
+    _remember_active_session(None)
+    _RECENT_TOUCHES.clear()
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Deleted %d sessions from sessions collection.", result.deleted_count)
     return result.deleted_count
 
 
-def get_session(session_id: str) -> Optional[Dict[str, Any]]:
-    col = _sessions_collection()
-    doc = col.find_one({"_id": session_id})
+async def get_session(session_id: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    doc = await sessions_col.find_one({"_id": session_id}, projection=projection)
     return doc
 
 
-def touch_session(session_id: str) -> bool:
-    col = _sessions_collection()
-    new_ttl = datetime.utcnow() + timedelta(minutes=SESSION_TTL_MINUTES)
-    result = col.update_one(
-        {"_id": session_id},
-        {"$set": {"last_activity_at": datetime.utcnow(), "ttl_expires_at": new_ttl}}
-    )
-    return result.matched_count == 1
-
-
 # -------------------------
 # Single-session helpers
 # -------------------------
-def _get_single_session_doc() -> Optional[Dict[str, Any]]:
-    col = _sessions_collection()
-    return col.find_one(sort=[("created_at", -1)])
+def _remember_active_session(session_id: Optional[str]) -> None:
+    global _active_session_id
+    _active_session_id = session_id
 
 
-def _ensure_session_exists() -> Dict[str, Any]:
-    sessions = _sessions_collection()
-    session = _get_single_session_doc()
-    if session:
-        try:
-            session_id = session["_id"]
-            touch_session(session_id)
-        except Exception:
-            pass
-        return session
-
-    new_session = SessionModel.new_session()
-    new_session.ttl_expires_at = datetime.utcnow() + timedelta(minutes=SESSION_TTL_MINUTES)
-    new_session.last_activity_at = datetime.utcnow()
-    doc = new_session.to_bson()
-    res = sessions.insert_one(doc)
-    logger.info("Inserted new single session (inserted_id=%s)", res.inserted_id)
+def _invalidate_session_cache() -> None:
+    # Called before each write so callers that mutated the cached dict in place
+    # never see it again, even if the write fails.
+    _SESSION_CACHE["doc"] = None
+    _SESSION_CACHE["ts"] = 0.0
+    _SESSION_CACHE["projection"] = None
+
+
+def _cached_session(projection: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    The cached session document, if still fresh and it covers `projection`: every
+    requested field must have been read with the same spec, so a document read with
+    {"turns": {"$slice": -1}} does not answer a request for {"turns": {"$slice": -6}}.
+    """
+    cached = _SESSION_CACHE["doc"]
+    if cached is not None and time.monotonic() - _SESSION_CACHE["ts"] < _SESSION_CACHE_TTL_S:
+        cached_projection = _SESSION_CACHE["projection"]
+        if cached_projection is None:
+            return cached
+        if projection is not None and all(
+            field in cached_projection and cached_projection[field] == spec for field, spec in projection.items()
+        ):
+            return cached
+    return None
+
+
+async def get_active_session(projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Return the active (most recent) session, limited to `projection` when given
+    (read-only callers pass SESSION_CONTEXT_PROJECTION; writers need the full document).
+    Uses the cached session id when available; falls back to the newest session by
+    created_at if the cached one is gone (TTL expiry, or deleted by another worker).
+    The document itself is reused for _SESSION_CACHE_TTL_S seconds if it covers the projection.
+    A read that reaches Mongo also extends the session's TTL in the same round trip
+    (see _find_and_touch_session).
+    """
+    cached = _cached_session(projection)
+    if cached is not None:
+        return cached
+
+    doc = None
+    if _active_session_id is not None:
+        doc = await _find_and_touch_session({"_id": _active_session_id}, projection)
+
+    if doc is None:
+        doc = await _find_and_touch_session({}, projection, sort=[("created_at", -1)])
+        _remember_active_session(doc.get("_id") if doc else None)
+
+    if doc is not None:
+        _SESSION_CACHE["doc"] = doc
+        _SESSION_CACHE["ts"] = time.monotonic()
+        _SESSION_CACHE["projection"] = dict(projection) if projection is not None else None
     return doc
 
 
-def _pick_random_question() -> Optional[Dict[str, Any]]:
-    qcol = db.get_collection("questions")
-    cursor = qcol.aggregate([{"$sample": {"size": 1}}])
-    try:
-        question = next(cursor, None)
-    except StopIteration:
-        question = None
-    return question
+async def _find_and_touch_session(
+    query: Dict[str, Any],
+    projection: Optional[Dict[str, Any]],
+    sort: Optional[List[Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a session and extend its TTL with one find_one_and_update instead of a
+    find_one followed by a separate touch. Debounced: a session this worker touched
+    within _TOUCH_DEBOUNCE_S seconds (at most that much TTL lost against a 30-minute
+    expiry) is only read, with no write at all. Beyond that, the update only changes the
+    fields when last_activity_at is older than the window, so a session another worker
+    (or any other session write) refreshed recently is a no-op update that Mongo doesn't
+    write to disk or the oplog.
+    """
+    session_id = query.get("_id")
+    if session_id is not None and session_id in _RECENT_TOUCHES:
+        return await sessions_col.find_one(query, projection=projection, sort=sort)
+    now = datetime.utcnow()
+    stale = {"$lt": ["$last_activity_at", now - _TOUCH_DEBOUNCE]}
+    doc = await sessions_col.find_one_and_update(
+        query,
+        [{"$set": {
+            "last_activity_at": {"$cond": [stale, now, "$last_activity_at"]},
+            "ttl_expires_at": {"$cond": [stale, now + _SESSION_TTL, "$ttl_expires_at"]},
+        }}],
+        projection=projection,
+        sort=sort,
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is not None:
+        _RECENT_TOUCHES[doc.get("_id")] = True
+    return doc
+
+
+# Turns kept on a session document; older ones are dropped by the bounded $push below so
+# the document (rewritten on every turn update) can't grow without limit. The final report
+# only reads the last few turns. questions_asked is capped the same way.
+MAX_TURNS_RETAINED = 50
+MAX_QUESTIONS_ASKED_RETAINED = 200
+
+
+def _bounded_turn_push(turn: Dict[str, Any]) -> Dict[str, Any]:
+    return {"$each": [turn], "$slice": -MAX_TURNS_RETAINED}
+
+
+# Fields the question-start update writes itself; everything else in a fresh session
+# document goes into $setOnInsert so the upsert creates a complete session.
+_START_QUESTION_FIELDS = ("current_question", "last_activity_at", "ttl_expires_at", "turns", "questions_asked")
+
+
+def _new_session_doc(now: datetime, target_role: Optional[str] = None, experience_level: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Raw document for a fresh session, same shape as SessionModel.new_session().to_bson()
+    but without constructing and validating a model; every field is a fixed default
+    except the two optional meta strings (empty values stored as None, as new_session does).
+    """
+    return {
+        "_id": gen_id(),
+        "created_at": now,
+        "last_activity_at": now,
+        "ttl_expires_at": now + _SESSION_TTL,
+        "meta": {"target_role": target_role or None, "experience_level": experience_level or None},
+        "current_question": None,
+        "turns": [],
+        "summary": None,
+        "questions_asked": [],
+        "main_questions_answered": 0,
+        "followups_answered": 0,
+        "final_report": None,
+    }
+
+
+def _session_insert_defaults(now: datetime) -> Dict[str, Any]:
+    doc = _new_session_doc(now)
+    for field in _START_QUESTION_FIELDS:
+        doc.pop(field, None)
+    return doc
+
+
+# Shuffled question ids, dealt from the end. Reshuffled from the whole bank only once it
+# runs out, so no question repeats until every one has been asked. Every
+# _QUESTION_DECK_TTL_S the bank is re-read and questions added since (possibly by another
+# worker) are shuffled into the undealt part; ids already dealt are not put back.
+_QUESTION_DECK: List[Any] = []
+_QUESTION_DECK_IDS: set = set()  # every id in the current deck, dealt or not
+_QUESTION_DECK_LOCK = asyncio.Lock()
+_QUESTION_DECK_TTL_S = 300.0
+_question_deck_expiry = 0.0
+
+# Question documents by _id. Prompt and rubric don't change once added, so a dealt
+# question is usually served without a round trip; the TTL bounds staleness after edits.
+_QUESTION_DOCS: TTLCache = TTLCache(maxsize=1024, ttl=_QUESTION_DECK_TTL_S)
+
+# The next question, fetched in the background right after one is dealt so that its
+# find_one overlaps the session upsert instead of preceding the next one.
+_prefetched_question: Optional["asyncio.Task[Optional[Dict[str, Any]]]"] = None
+
+
+async def _refill_question_deck() -> None:
+    global _question_deck_expiry
+    cursor = questions_col.find({}, projection={"_id": 1})
+    ids = [d["_id"] async for d in cursor]
+    random.shuffle(ids)
+    _QUESTION_DECK[:] = ids
+    _QUESTION_DECK_IDS.clear()
+    _QUESTION_DECK_IDS.update(ids)
+    _question_deck_expiry = time.monotonic() + _QUESTION_DECK_TTL_S
+
+
+async def _top_up_question_deck() -> None:
+    global _question_deck_expiry
+    cursor = questions_col.find({}, projection={"_id": 1})
+    async for d in cursor:
+        if d["_id"] not in _QUESTION_DECK_IDS:
+            _QUESTION_DECK.insert(random.randint(0, len(_QUESTION_DECK)), d["_id"])
+            _QUESTION_DECK_IDS.add(d["_id"])
+    _question_deck_expiry = time.monotonic() + _QUESTION_DECK_TTL_S
+
+
+async def warm_question_cache() -> int:
+    """
+    Load the question bank in one query at startup: deals a fresh deck and fills the
+    question document cache, so the first questions asked need no extra round trips.
+    Returns the number of questions loaded.
+    """
+    global _question_deck_expiry
+    async with _QUESTION_DECK_LOCK:
+        ids: List[Any] = []
+        async for doc in questions_col.find({}):
+            ids.append(doc["_id"])
+            if len(_QUESTION_DOCS) < _QUESTION_DOCS.maxsize:
+                _QUESTION_DOCS[doc["_id"]] = doc
+        random.shuffle(ids)
+        _QUESTION_DECK[:] = ids
+        _QUESTION_DECK_IDS.clear()
+        _QUESTION_DECK_IDS.update(ids)
+        _question_deck_expiry = time.monotonic() + _QUESTION_DECK_TTL_S
+    return len(ids)
+
+
+async def _get_question(q_id: Any) -> Optional[Dict[str, Any]]:
+    doc = _QUESTION_DOCS.get(q_id)
+    if doc is None:
+        doc = await questions_col.find_one({"_id": q_id})
+        if doc is not None:
+            _QUESTION_DOCS[q_id] = doc
+    return doc
+
+
+async def _deal_question() -> Optional[Dict[str, Any]]:
+    # Two passes: the current deck, then one fresh refill (ids may be stale if
+    # questions were deleted; find_one returns None for those and they are skipped).
+    for _ in range(2):
+        if not _QUESTION_DECK or time.monotonic() >= _question_deck_expiry:
+            async with _QUESTION_DECK_LOCK:
+                if not _QUESTION_DECK:
+                    await _refill_question_deck()
+                elif time.monotonic() >= _question_deck_expiry:
+                    await _top_up_question_deck()
+        while _QUESTION_DECK:
+            doc = await _get_question(_QUESTION_DECK.pop())
+            if doc is not None:
+                return doc
+    return None
+
+
+async def _pick_random_question() -> Optional[Dict[str, Any]]:
+    """
+    Pick one random question: deal the next id from the shuffled deck and fetch it by
+    _id (a primary-key hit), usually already done by the prefetch started on the
+    previous pick.
+    """
+    global _prefetched_question
+    task, _prefetched_question = _prefetched_question, None
+    doc = None
+    if task is not None:
+        try:
+            doc = await task
+        except Exception as e:
+            logger.debug("Prefetched question failed, dealing a fresh one: %s", e)
+    if doc is None:
+        doc = await _deal_question()
+    if doc is not None:
+        _prefetched_question = asyncio.create_task(_deal_question())
+    return doc
 
 
 # -------------------------
 # Business: start a question for session
 # -------------------------
-def start_question_for_session() -> Dict[str, Any]:
-    sessions_col = _sessions_collection()
-    questions_col = db.get_collection("questions")
-
-    session = _ensure_session_exists()
-    session_id = session.get("_id")
+async def start_question_for_session() -> Dict[str, Any]:
+    """
+    Assign a new main question to the latest session, creating the session if needed.
+    The question is picked first; the session lookup, touch and question write then go
+    out as one find_one_and_update upsert instead of a read, a touch and an update.
+    """
 
-    question = _pick_random_question()
+    question = await _pick_random_question()
     if not question:
         logger.error("No questions found in questions collection.")
         raise RuntimeError("No questions available in the question bank.")
 
+    now = datetime.utcnow()
     q_id = str(question.get("_id"))
     prompt_text = question.get("prompt", "")
     rubric = question.get("rubric", []) or []
@@ -130,31 +359,42 @@ def start_question_for_session() -> Dict[str, Any]:
         "type": q_type,
         "topic": topic,
         "turn_type": "main",
-        "assigned_at": datetime.utcnow()
+        "assigned_at": now
     }
 
     turn_doc = {
-        "turn_id": f"turn_{uuid.uuid4().hex[:8]}",
+        "turn_id": gen_turn_id(),
         "q_id": q_id,
         "turn_type": "main",
         "q_text": prompt_text,
         "answer_text": None,
-        "timestamp": datetime.utcnow(),
+        "timestamp": now,
         "feedback": None
     }
 
     update_ops = {
         "$set": {
             "current_question": current_question,
-            "last_activity_at": datetime.utcnow()
+            "last_activity_at": now,
+            "ttl_expires_at": now + _SESSION_TTL
         },
         "$push": {
-            "turns": turn_doc,
-            "questions_asked": q_id
-        }
+            "turns": _bounded_turn_push(turn_doc),
+            "questions_asked": {"$each": [q_id], "$slice": -MAX_QUESTIONS_ASKED_RETAINED}
+        },
+        "$setOnInsert": _session_insert_defaults(now)
     }
 
-    sessions_col.update_one({"_id": session_id}, update_ops)
+    _invalidate_session_cache()
+    session = await sessions_col.find_one_and_update(
+        {},
+        update_ops,
+        sort=[("created_at", -1)],
+        projection={"_id": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    _remember_active_session(session.get("_id"))
 
     return {
         "reply": prompt_text,
@@ -167,8 +407,12 @@ def start_question_for_session() -> Dict[str, Any]:
 # -------------------------
 # Answer routing helper (in-session)
 # -------------------------
-def route_answer_for_session(user_answer: str) -> Dict[str, Any]:
-    session = _get_single_session_doc()
+async def route_answer_for_session(user_answer: str) -> Dict[str, Any]:
+    """
+    Decide which checker handles the answer. The returned "session" (read with
+    SESSION_CONTEXT_PROJECTION) can be passed on to that checker so it doesn't re-read it.
+    """
+    session = await get_active_session(SESSION_CONTEXT_PROJECTION)
     if not session:
         logger.error("route_answer_for_session called but no active session found.")
         return {
@@ -178,6 +422,7 @@ def route_answer_for_session(user_answer: str) -> Dict[str, Any]:
             "question_text": None,
             "session_id": None,
             "user_answer": user_answer,
+            "session": None,
         }
 
     session_id = session.get("_id")
@@ -201,6 +446,7 @@ def route_answer_for_session(user_answer: str) -> Dict[str, Any]:
         "question_text": q_text,
         "session_id": session_id,
         "user_answer": user_answer,
+        "session": session,
     }
 
 
@@ -238,15 +484,139 @@ Candidate answer:
 """
 
 
-def _evaluate_answer_with_gemini(question_text: str, rubric: List[str], candidate_answer: str) -> Dict[str, Any]:
-    prompt = EVAL_PROMPT_TEMPLATE.format(
-        question_text=question_text.replace('"', '\\"'),
-        rubric_json=json.dumps(rubric or []),
-        candidate_answer=candidate_answer.replace('"', '\\"')
-    )
+(
+    _EVAL_HEAD, _EVAL_RUBRIC, _EVAL_ANSWER, _EVAL_TAIL
+) = split_template(EVAL_PROMPT_TEMPLATE, ("question_text", "rubric_json", "candidate_answer"))
+
+_QUOTE_ESCAPE = str.maketrans({'"': '\\"'})
+
+# Structured output: Gemini returns exactly this object, so the reply always parses as
+# JSON. The output cap is the answer budget plus a fixed thinking budget (2.5-pro can't
+# turn thinking off), so a long deliberation can't crowd out the JSON.
+EVAL_MAX_TOKENS = 400
+EVAL_THINKING_BUDGET = 1024
+EVAL_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "feedback": {"type": "STRING"},
+        "classification": {"type": "STRING", "enum": ["correct", "somewhat_correct", "wrong"]},
+        "confidence": {"type": "NUMBER"},
+    },
+    "required": ["feedback", "classification", "confidence"],
+}
 
+
+def _build_eval_prompt(question_text: str, rubric: List[str], candidate_answer: str) -> str:
+    return "".join((
+        _EVAL_HEAD, question_text.translate(_QUOTE_ESCAPE),
+        _EVAL_RUBRIC, rubric_to_json(rubric),
+        _EVAL_ANSWER, candidate_answer.translate(_QUOTE_ESCAPE),
+        _EVAL_TAIL,
+    ))
+
+
+# Answers that say nothing (plus blank / punctuation-only input); graded locally
+# without a Gemini call. Only applied once the message is known to be an answer: "?" is
+# usually a clarification request, "skip" a skip, and "nothing" or "not sure" can be a
+# real answer, so none of those are listed here.
+_NON_ANSWERS = frozenset({
+    "idk", "i dont know", "i don't know", "dont know", "don't know", "no idea", "no clue",
+})
+
+_NON_ANSWER_EVALUATION = {
+    "feedback": "Answer too brief or skipped — try to articulate what you know, even partially.",
+    "classification": "wrong",
+    "confidence": 0.95,
+}
+
+
+def _is_non_answer(candidate_answer: str) -> bool:
+    text = candidate_answer.strip().lower().replace("’", "'").rstrip(".!")
+    return text in _NON_ANSWERS or not any(ch.isalnum() for ch in text)
+
+
+def non_answer_evaluation(candidate_answer: str) -> Optional[Dict[str, Any]]:
+    """
+    The canned "wrong" evaluation for an "idk"-style non-answer, else None.
+    Only for messages already classified as answers.
+    """
+    return dict(_NON_ANSWER_EVALUATION) if _is_non_answer(candidate_answer) else None
+
+
+# Evaluations of resubmitted answers: the same answer (modulo case/whitespace) to the
+# same question is graded from memory instead of another Gemini round trip.
+_EVAL_CACHE: TTLCache = TTLCache(maxsize=2048, ttl=3600)
+
+
+def _eval_cache_key(question_text: str, candidate_answer: str) -> bytes:
+    normalized = " ".join(candidate_answer.lower().split())
+    return hashlib.blake2b(f"{question_text}|{normalized}".encode("utf-8"), digest_size=16).digest()
+
+
+# Second tier behind _EVAL_CACHE, shared by all workers and restarts; entries expire via
+# the eval_cache TTL index. Writes are unacknowledged: a lost entry only costs a future miss.
+_eval_cache_unacked = eval_cache_col.with_options(write_concern=WriteConcern(w=0))
+
+
+async def _load_persisted_evaluation(cache_key: bytes) -> Optional[Dict[str, Any]]:
     try:
-        raw = call_gemini(prompt=prompt, model="gemini-2.5-pro", max_tokens=400, temperature=0.0)
+        doc = await eval_cache_col.find_one({"_id": cache_key}, projection={"evaluation": 1})
+    except Exception as e:
+        logger.warning("Evaluation cache lookup failed: %s", e)
+        return None
+    if doc is None or not isinstance(doc.get("evaluation"), dict):
+        return None
+    _EVAL_CACHE[cache_key] = doc["evaluation"]
+    return doc["evaluation"]
+
+
+async def _persist_evaluation(cache_key: bytes, evaluation: Dict[str, Any]) -> None:
+    try:
+        await _eval_cache_unacked.update_one(
+            {"_id": cache_key},
+            {"$set": {"evaluation": evaluation, "created_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning("Evaluation cache write failed: %s", e)
+
+
+async def cached_evaluation(question_text: str, candidate_answer: str) -> Optional[Dict[str, Any]]:
+    """Evaluation of the same answer to the same question from either cache tier, or None."""
+    cache_key = _eval_cache_key(question_text, candidate_answer)
+    cached = _EVAL_CACHE.get(cache_key)
+    if cached is None:
+        cached = await _load_persisted_evaluation(cache_key)
+    return dict(cached) if cached is not None else None
+
+
+async def remember_evaluation(question_text: str, candidate_answer: str, evaluation: Dict[str, Any]) -> None:
+    """Store a fresh evaluation in both cache tiers."""
+    cache_key = _eval_cache_key(question_text, candidate_answer)
+    _EVAL_CACHE[cache_key] = dict(evaluation)
+    await _persist_evaluation(cache_key, _EVAL_CACHE[cache_key])
+
+
+async def _evaluate_answer_with_gemini(question_text: str, rubric: List[str], candidate_answer: str) -> Dict[str, Any]:
+    if _is_non_answer(candidate_answer):
+        return dict(_NON_ANSWER_EVALUATION)
+
+    cached = await cached_evaluation(question_text, candidate_answer)
+    if cached is not None:
+        return cached
+
+    prompt = _build_eval_prompt(question_text, rubric, candidate_answer)
+
+    try:
+        raw = await call_gemini(
+            prompt=prompt,
+            model="gemini-2.5-pro",
+            max_tokens=EVAL_MAX_TOKENS,
+            thinking_budget=EVAL_THINKING_BUDGET,
+            temperature=0.0,
+            response_mime_type="application/json",
+            response_schema=EVAL_RESPONSE_SCHEMA,
+        )
     except Exception as e:
         logger.exception("Gemini evaluation call failed: %s", e)
         return {
@@ -255,132 +625,143 @@ def _evaluate_answer_with_gemini(question_text: str, rubric: List[str], candidat
             "confidence": 0.0
         }
 
-    parsed = None
     try:
-        parsed = json.loads(raw)
-    except Exception:
-        try:
-            start = raw.find("{")
-            end = raw.rfind("}") + 1
-            parsed = json.loads(raw[start:end])
-        except Exception as e:
-            logger.exception("Failed to parse Gemini eval output: %s; raw output: %s", e, raw)
-            return {
-                "feedback": "Received invalid evaluation output from evaluator.",
-                "classification": "somewhat_correct",
-                "confidence": 0.0
-            }
-
-    feedback = parsed.get("feedback", "").strip() if isinstance(parsed.get("feedback", ""), str) else str(parsed.get("feedback", ""))
-    classification = parsed.get("classification", "")
-    confidence = parsed.get("confidence", 0.0)
-
-    if classification not in ("correct", "somewhat_correct", "wrong"):
-        logger.warning("Unexpected classification from Gemini: %s", classification)
-        classification = "somewhat_correct"
-
-    try:
-        confidence = float(confidence)
-    except Exception:
-        confidence = 0.0
-    confidence = max(0.0, min(1.0, confidence))
+        parsed = loads_json(raw)
+    except Exception as e:
+        logger.exception("Failed to parse Gemini eval output: %s; raw output: %s", e, raw)
+        return {
+            "feedback": "Received invalid evaluation output from evaluator.",
+            "classification": "somewhat_correct",
+            "confidence": 0.0
+        }
 
-    return {
-        "feedback": feedback,
-        "classification": classification,
-        "confidence": confidence
-    }
+    evaluation = normalize_evaluation(parsed)
+    await remember_evaluation(question_text, candidate_answer, evaluation)
+    return evaluation
 
 
 # -------------------------
 # Update helpers
 # -------------------------
-def _update_session_doc(session_id: str, new_doc: Dict[str, Any]) -> None:
-    col = _sessions_collection()
-    col.replace_one({"_id": session_id}, new_doc)
+async def _apply_turn_update(
+    session: Dict[str, Any],
+    turn_type: str,
+    answer_text: str,
+    evaluation: Dict[str, Any],
+    counter_field: str,
+    current_question_update: Dict[str, Any],
+) -> None:
+    """
+    Record an answer on the session's last turn with a single targeted update_one:
+    $set of the turn's answer fields (matched by turn_id via the positional operator),
+    the current_question change and last_activity_at, plus $inc of the answered counter.
+    `session` needs _id, current_question and at least the last turn (SESSION_CONTEXT_PROJECTION).
+    If the session has no turns yet, the answered turn is pushed instead.
+    """
+    now = datetime.utcnow()
+    turns = session.get("turns") or []
+    last_turn_id = turns[-1].get("turn_id") if turns else None
+
+    query: Dict[str, Any] = {"_id": session.get("_id")}
+    update: Dict[str, Any] = {
+        "$set": {**current_question_update, "last_activity_at": now},
+        "$inc": {counter_field: 1},
+    }
+    if last_turn_id is not None:
+        query["turns.turn_id"] = last_turn_id
+        update["$set"].update({
+            "turns.$.answer_text": answer_text,
+            "turns.$.timestamp": now,
+            "turns.$.feedback": evaluation,
+        })
+    else:
+        current_q = session.get("current_question") or {}
+        update["$push"] = {"turns": _bounded_turn_push({
+            "turn_id": gen_turn_id(),
+            "q_id": current_q.get("q_id"),
+            "turn_type": turn_type,
+            "q_text": current_q.get("prompt", ""),
+            "answer_text": answer_text,
+            "timestamp": now,
+            "feedback": evaluation,
+        })}
+
+    _invalidate_session_cache()
+    await sessions_col.update_one(query, update)
 
 
 # -------------------------
 # Public functions to check answers and update session
 # -------------------------
-def check_main_answer(user_answer: str) -> Dict[str, Any]:
-    session = _get_single_session_doc()
+async def check_main_answer(
+    user_answer: str,
+    evaluation: Optional[Dict[str, Any]] = None,
+    session: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Evaluate the answer to the current main question and record it on the last turn.
+    `evaluation` may be supplied when the answer was already graded alongside intent
+    classification; otherwise Gemini is called here. `session` may be the one
+    route_answer_for_session already read; otherwise it is fetched here.
+    """
+    if session is None:
+        session = await get_active_session(SESSION_CONTEXT_PROJECTION)
     if not session:
         raise RuntimeError("No active session")
 
-    session_id = session.get("_id")
     current_q = session.get("current_question", {})
     question_text = current_q.get("prompt", "")
     rubric = current_q.get("rubric", []) or []
 
-    evaluation = _evaluate_answer_with_gemini(question_text=question_text, rubric=rubric, candidate_answer=user_answer)
+    # The follow-up doesn't depend on the answer; usually already started by classify_and_evaluate
+    prefetch_followup(current_q)
 
-    turns = session.get("turns", []) or []
-    if not turns:
-        turn = {
-            "turn_id": f"turn_{uuid.uuid4().hex[:8]}",
-            "q_id": current_q.get("q_id"),
-            "turn_type": "main",
-            "q_text": question_text,
-            "answer_text": user_answer,
-            "timestamp": datetime.utcnow(),
-            "feedback": evaluation,
-        }
-        turns.append(turn)
-    else:
-        last_turn = turns[-1]
-        last_turn["answer_text"] = user_answer
-        last_turn["timestamp"] = datetime.utcnow()
-        last_turn["feedback"] = evaluation
-        turns[-1] = last_turn
-
-    session["turns"] = turns
-    session["current_question"]["turn_type"] = "followup"
-    session["main_questions_answered"] = int(session.get("main_questions_answered", 0)) + 1
-    session["last_activity_at"] = datetime.utcnow()
+    if evaluation is None:
+        evaluation = await _evaluate_answer_with_gemini(question_text=question_text, rubric=rubric, candidate_answer=user_answer)
 
-    _update_session_doc(session_id, session)
+    await _apply_turn_update(
+        session,
+        turn_type="main",
+        answer_text=user_answer,
+        evaluation=evaluation,
+        counter_field="main_questions_answered",
+        current_question_update={"current_question.turn_type": "followup"},
+    )
 
     return evaluation
 
 
-def check_followup_answer(user_answer: str) -> Dict[str, Any]:
-    session = _get_single_session_doc()
+async def check_followup_answer(
+    user_answer: str,
+    evaluation: Optional[Dict[str, Any]] = None,
+    session: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Evaluate the answer to the current followup question and record it on the last turn.
+    `evaluation` may be supplied when the answer was already graded alongside intent
+    classification; otherwise Gemini is called here. `session` may be the one
+    route_answer_for_session already read; otherwise it is fetched here.
+    """
+    if session is None:
+        session = await get_active_session(SESSION_CONTEXT_PROJECTION)
     if not session:
         raise RuntimeError("No active session")
 
-    session_id = session.get("_id")
     current_q = session.get("current_question", {})
     question_text = current_q.get("prompt", "")
     rubric = current_q.get("rubric", []) or []
 
-    evaluation = _evaluate_answer_with_gemini(question_text=question_text, rubric=rubric, candidate_answer=user_answer)
-
-    turns = session.get("turns", []) or []
-    if not turns:
-        turn = {
-            "turn_id": f"turn_{uuid.uuid4().hex[:8]}",
-            "q_id": current_q.get("q_id"),
-            "turn_type": "followup",
-            "q_text": question_text,
-            "answer_text": user_answer,
-            "timestamp": datetime.utcnow(),
-            "feedback": evaluation,
-        }
-        turns.append(turn)
-    else:
-        last_turn = turns[-1]
-        last_turn["answer_text"] = user_answer
-        last_turn["timestamp"] = datetime.utcnow()
-        last_turn["feedback"] = evaluation
-        turns[-1] = last_turn
-
-    session["turns"] = turns
-    session["current_question"] = None
-    session["followups_answered"] = int(session.get("followups_answered", 0)) + 1
-    session["last_activity_at"] = datetime.utcnow()
+    if evaluation is None:
+        evaluation = await _evaluate_answer_with_gemini(question_text=question_text, rubric=rubric, candidate_answer=user_answer)
 
-    _update_session_doc(session_id, session)
+    await _apply_turn_update(
+        session,
+        turn_type="followup",
+        answer_text=user_answer,
+        evaluation=evaluation,
+        counter_field="followups_answered",
+        current_question_update={"current_question": None},
+    )
 
     return evaluation
 
@@ -417,20 +798,47 @@ Original rubric:
 
 """
 
-def generate_followup_question(orig_question: str, orig_rubric: List[str], orig_topic: Optional[str], orig_type: Optional[str]) -> Dict[str, Any]:
+_FOLLOWUP_HEAD, _FOLLOWUP_RUBRIC, _FOLLOWUP_TAIL = split_template(FOLLOWUP_GEN_PROMPT, ("orig_question", "orig_rubric"))
+
+FOLLOWUP_MAX_TOKENS = 300
+FOLLOWUP_THINKING_BUDGET = 512
+FOLLOWUP_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "topic": {"type": "STRING", "enum": ["OOPS", "DBMS", "OS", "CN"]},
+        "type": {"type": "STRING", "enum": ["conceptual", "code", "design"]},
+        "prompt": {"type": "STRING"},
+        "rubric": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "requires_clarification_allowed": {"type": "BOOLEAN"},
+        "requires_llm": {"type": "BOOLEAN"},
+    },
+    "required": ["topic", "type", "prompt", "rubric"],
+}
+
+
+async def generate_followup_question(orig_question: str, orig_rubric: List[str], orig_topic: Optional[str], orig_type: Optional[str]) -> Dict[str, Any]:
     """
     Generate a follow-up question JSON via Gemini.
     Returns a dict matching QuestionModel-like fields.
 
     Raises RuntimeError with clear message on failure.
     """
-    prompt = FOLLOWUP_GEN_PROMPT.format(
-        orig_question=orig_question.replace('"', '\\"'),
-        orig_rubric=json.dumps(orig_rubric or []),
-    )
+    prompt = "".join((
+        _FOLLOWUP_HEAD, orig_question.translate(_QUOTE_ESCAPE),
+        _FOLLOWUP_RUBRIC, rubric_to_json(orig_rubric),
+        _FOLLOWUP_TAIL,
+    ))
 
     try:
-        raw = call_gemini(prompt=prompt, model="gemini-2.5-pro", max_tokens=300, temperature=0.0)
+        raw = await call_gemini(
+            prompt=prompt,
+            model="gemini-2.5-pro",
+            max_tokens=FOLLOWUP_MAX_TOKENS,
+            thinking_budget=FOLLOWUP_THINKING_BUDGET,
+            temperature=0.0,
+            response_mime_type="application/json",
+            response_schema=FOLLOWUP_RESPONSE_SCHEMA,
+        )
     except Exception as e:
         logger.exception("Failed to call Gemini for followup generation: %s", e)
         raise RuntimeError("Follow-up generation failed (LLM call)")
@@ -438,30 +846,18 @@ def generate_followup_question(orig_question: str, orig_rubric: List[str], orig_
     # Normalize raw to string
     raw_text = "" if raw is None else str(raw).strip()
 
-    # Try direct parse, otherwise try to extract substring between first { and last }
-    parsed = None
     if not raw_text:
         logger.error("Empty response from Gemini while generating follow-up.")
         raise RuntimeError("Follow-up generation returned empty response")
 
-    # Attempt to parse JSON-safe substring(s)
-    parse_errors = []
+    # The response schema guarantees a bare JSON object
     try:
-        parsed = json.loads(raw_text)
+        parsed = loads_json(raw_text)
     except Exception as e:
-        parse_errors.append(str(e))
-        # attempt to find first JSON object in the text
-        start = raw_text.find("{")
-        end = raw_text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            candidate = raw_text[start:end+1]
-            try:
-                parsed = json.loads(candidate)
-            except Exception as e2:
-                parse_errors.append(str(e2))
+        parsed = None
+        logger.error("Failed to parse followup JSON: %s raw=%s", e, raw_text)
 
     if not parsed or not isinstance(parsed, dict):
-        logger.exception("Failed to parse followup JSON. raw=%s parse_errors=%s", raw_text, parse_errors)
         raise RuntimeError("Follow-up generation returned invalid JSON")
 
     # Validate required fields
@@ -481,7 +877,7 @@ def generate_followup_question(orig_question: str, orig_rubric: List[str], orig_
         qtype = orig_type or qtype
 
     followup = {
-        "_id": f"generated_{uuid.uuid4().hex[:8]}",
+        "_id": f"generated_{secrets.token_hex(4)}",
         "topic": topic,
         "type": qtype,
         "prompt": prompt_text,
@@ -493,7 +889,54 @@ def generate_followup_question(orig_question: str, orig_rubric: List[str], orig_
     return followup
 
 
-def handle_positive_ready() -> Dict[str, Any]:
+# Follow-up for the current main question, generated in the background so that its Gemini
+# call overlaps the answer's evaluation instead of starting when the candidate asks for it.
+# classify_and_evaluate starts it alongside the fused call; check_main_answer covers the
+# paths that grade elsewhere. Held as (main q_id, task).
+_prefetched_followup: Optional[Tuple[Any, "asyncio.Task[Dict[str, Any]]"]] = None
+
+
+def prefetch_followup(current_q: Dict[str, Any]) -> None:
+    """Start generating the follow-up for `current_q` unless that is already under way."""
+    global _prefetched_followup
+    if _prefetched_followup is not None:
+        q_id, task = _prefetched_followup
+        if q_id == current_q.get("q_id") and not (task.done() and (task.cancelled() or task.exception())):
+            return
+        task.cancel()
+    task = asyncio.create_task(generate_followup_question(
+        orig_question=current_q.get("prompt", ""),
+        orig_rubric=current_q.get("rubric", []) or [],
+        orig_topic=current_q.get("topic"),
+        orig_type=current_q.get("type"),
+    ))
+    # A follow-up that's never asked for must not log "exception was never retrieved"
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    _prefetched_followup = (current_q.get("q_id"), task)
+
+
+async def _followup_for(current_q: Dict[str, Any]) -> Dict[str, Any]:
+    """Follow-up for `current_q`: the prefetched one if it matches, otherwise generated now."""
+    global _prefetched_followup
+    prefetched, _prefetched_followup = _prefetched_followup, None
+    if prefetched is not None:
+        q_id, task = prefetched
+        if q_id == current_q.get("q_id"):
+            try:
+                return await task
+            except Exception as e:
+                logger.debug("Prefetched follow-up failed, generating again: %s", e)
+        else:
+            task.cancel()
+    return await generate_followup_question(
+        orig_question=current_q.get("prompt", ""),
+        orig_rubric=current_q.get("rubric", []) or [],
+        orig_topic=current_q.get("topic"),
+        orig_type=current_q.get("type"),
+    )
+
+
+async def handle_positive_ready() -> Dict[str, Any]:
     """
     Handles 'positive_ready' intent per rules:
     - if no session/current_question -> start a main question
@@ -506,9 +949,10 @@ def handle_positive_ready() -> Dict[str, Any]:
         - if last turn has answer_text -> generate follow-up
     """
     try:
-        session = _get_single_session_doc()
+        # Only current_question and the last turn are inspected here.
+        session = await get_active_session(SESSION_CONTEXT_PROJECTION)
         if not session:
-            return start_question_for_session()
+            return await start_question_for_session()
 
         current_q = session.get("current_question")
         turns = session.get("turns", []) or []
@@ -516,7 +960,7 @@ def handle_positive_ready() -> Dict[str, Any]:
 
         # If there's no current question, start a main
         if not current_q:
-            return start_question_for_session()
+            return await start_question_for_session()
 
         turn_type = current_q.get("turn_type")
         last_has_answer = bool(last_turn and last_turn.get("answer_text"))
@@ -527,24 +971,15 @@ def handle_positive_ready() -> Dict[str, Any]:
             # If the last turn was the MAIN question and it has an answer -> user answered main; generate followup
             if last_turn_type == "main" and last_has_answer:
                 # generate followup based on the main that was answered
-                orig_question_text = current_q.get("prompt", "")
-                orig_rubric = current_q.get("rubric", []) or []
-                orig_topic = current_q.get("topic")
-                orig_type = current_q.get("type")
-
                 try:
-                    followup = generate_followup_question(
-                        orig_question=orig_question_text,
-                        orig_rubric=orig_rubric,
-                        orig_topic=orig_topic,
-                        orig_type=orig_type
-                    )
+                    followup = await _followup_for(current_q)
                 except Exception as e:
                     logger.exception("generate_followup_question failed: %s", e)
                     return {"reply": "Sorry — failed to generate a follow-up question. Try again later."}
 
                 session_id = session.get("_id")
                 followup_qid = str(followup.get("_id"))
+                now = datetime.utcnow()
                 current_question = {
                     "q_id": followup_qid,
                     "prompt": followup.get("prompt"),
@@ -552,24 +987,25 @@ def handle_positive_ready() -> Dict[str, Any]:
                     "type": followup.get("type"),
                     "topic": followup.get("topic"),
                     "turn_type": "followup",
-                    "assigned_at": datetime.utcnow()
+                    "assigned_at": now
                 }
 
                 followup_turn = {
-                    "turn_id": f"turn_{uuid.uuid4().hex[:8]}",
+                    "turn_id": gen_turn_id(),
                     "q_id": followup_qid,
                     "turn_type": "followup",
                     "q_text": followup.get("prompt"),
                     "answer_text": None,
-                    "timestamp": datetime.utcnow(),
+                    "timestamp": now,
                     "feedback": None
                 }
 
-                _sessions_collection().update_one(
+                _invalidate_session_cache()
+                await sessions_col.update_one(
                     {"_id": session_id},
                     {
-                        "$set": {"current_question": current_question, "last_activity_at": datetime.utcnow()},
-                        "$push": {"turns": followup_turn}
+                        "$set": {"current_question": current_question, "last_activity_at": now},
+                        "$push": {"turns": _bounded_turn_push(followup_turn)}
                     }
                 )
 
@@ -582,7 +1018,7 @@ def handle_positive_ready() -> Dict[str, Any]:
 
             # If the last turn was a FOLLOWUP and it has an answer -> move to next main
             if last_turn_type == "followup" and last_has_answer:
-                return start_question_for_session()
+                return await start_question_for_session()
 
             # Otherwise no answer yet for the relevant turn
             return {"reply": "Please answer the current question first before moving on."}
@@ -594,24 +1030,15 @@ def handle_positive_ready() -> Dict[str, Any]:
                 return {"reply": "Please answer the current question first before I generate a follow-up."}
 
             # Main answered -> generate follow-up (same as above)
-            orig_question_text = current_q.get("prompt", "")
-            orig_rubric = current_q.get("rubric", []) or []
-            orig_topic = current_q.get("topic")
-            orig_type = current_q.get("type")
-
             try:
-                followup = generate_followup_question(
-                    orig_question=orig_question_text,
-                    orig_rubric=orig_rubric,
-                    orig_topic=orig_topic,
-                    orig_type=orig_type
-                )
+                followup = await _followup_for(current_q)
             except Exception as e:
                 logger.exception("generate_followup_question failed: %s", e)
                 return {"reply": "Sorry — failed to generate a follow-up question. Try again later."}
 
             session_id = session.get("_id")
             followup_qid = str(followup.get("_id"))
+            now = datetime.utcnow()
             current_question = {
                 "q_id": followup_qid,
                 "prompt": followup.get("prompt"),
@@ -619,24 +1046,25 @@ def handle_positive_ready() -> Dict[str, Any]:
                 "type": followup.get("type"),
                 "topic": followup.get("topic"),
                 "turn_type": "followup",
-                "assigned_at": datetime.utcnow()
+                "assigned_at": now
             }
 
             followup_turn = {
-                "turn_id": f"turn_{uuid.uuid4().hex[:8]}",
+                "turn_id": gen_turn_id(),
                 "q_id": followup_qid,
                 "turn_type": "followup",
                 "q_text": followup.get("prompt"),
                 "answer_text": None,
-                "timestamp": datetime.utcnow(),
+                "timestamp": now,
                 "feedback": None
             }
 
-            _sessions_collection().update_one(
+            _invalidate_session_cache()
+            await sessions_col.update_one(
                 {"_id": session_id},
                 {
-                    "$set": {"current_question": current_question, "last_activity_at": datetime.utcnow()},
-                    "$push": {"turns": followup_turn}
+                    "$set": {"current_question": current_question, "last_activity_at": now},
+                    "$push": {"turns": _bounded_turn_push(followup_turn)}
                 }
             )
 
@@ -648,7 +1076,7 @@ def handle_positive_ready() -> Dict[str, Any]:
             }
 
         # Fallback: start a new main
-        return start_question_for_session()
+        return await start_question_for_session()
 
     except Exception as exc:
         logger.exception("handle_positive_ready error: %s", exc)
@@ -680,6 +1108,13 @@ Context:
 {context}
 """
 
+_FINAL_REPORT_HEAD, _FINAL_REPORT_TAIL = split_template(FINAL_REPORT_PROMPT, ("context",))
+
+# 300-400 words of review, plus a fixed thinking budget on top (see EVAL_MAX_TOKENS)
+FINAL_REPORT_MAX_TOKENS = 800
+FINAL_REPORT_THINKING_BUDGET = 1024
+
+
 def _build_final_context_from_session(session: Dict[str, Any]) -> str:
     """
     Build a compact context summary from the session turns.
@@ -687,34 +1122,26 @@ def _build_final_context_from_session(session: Dict[str, Any]) -> str:
     and include question prompt (shortened), the stored LLM feedback text, classification, and confidence.
     """
     turns = session.get("turns", []) or []
-    # Collect last answered turns grouped by q_id, keep order
+    # Walk back from the newest turn grouping by q_id; stop at the 4th distinct q_id
+    # so only the turns of the latest 3 questions are visited.
     grouped: Dict[str, Dict[str, Any]] = {}
-    order: List[str] = []
-    for t in turns:
+    for t in reversed(turns):
         qid = t.get("q_id") or "<unknown>"
-        if qid not in grouped:
-            grouped[qid] = {"main": None, "followup": None, "q_text": t.get("q_text") or ""}
-            order.append(qid)
-        # classify by turn_type
+        entry = grouped.get(qid)
+        if entry is None:
+            if len(grouped) == 3:
+                break
+            entry = grouped[qid] = {"main": None, "followup": None, "q_text": ""}
         tt = t.get("turn_type")
-        if tt == "main" and grouped[qid]["main"] is None:
-            grouped[qid]["main"] = t
-            if not grouped[qid]["q_text"]:
-                grouped[qid]["q_text"] = t.get("q_text") or ""
-        elif tt == "followup" and grouped[qid]["followup"] is None:
-            grouped[qid]["followup"] = t
-            if not grouped[qid]["q_text"]:
-                grouped[qid]["q_text"] = t.get("q_text") or ""
-
-    # We want the most recent 3 main qids (preserve recency)
-    # order is insertion order; we prefer the last items
-    selected_qids = [q for q in reversed(order)][:3]
-    selected_qids.reverse()  # keep chronological order oldest->newest
+        if tt in ("main", "followup") and entry[tt] is None:
+            entry[tt] = t
+        if not entry["q_text"]:
+            entry["q_text"] = t.get("q_text") or ""
 
     parts = []
-    for idx, qid in enumerate(selected_qids, start=1):
-        entry = grouped.get(qid, {})
-        qtext = (entry.get("q_text") or "")[:220].replace("\n", " ").strip()
+    # grouped is newest-first; report oldest->newest
+    for idx, entry in enumerate(reversed(grouped.values()), start=1):
+        qtext = entry["q_text"][:220].replace("\n", " ").strip()
         main_turn = entry.get("main")
         follow_turn = entry.get("followup")
 
@@ -739,8 +1166,8 @@ def _build_final_context_from_session(session: Dict[str, Any]) -> str:
             parts.append("  - Follow-up: not answered / not evaluated.")
 
     # Add simple aggregate stats
-    main_count = int(session.get("main_questions_answered", 0))
-    follow_count = int(session.get("followups_answered", 0))
+    main_count = session.get("main_questions_answered", 0)
+    follow_count = session.get("followups_answered", 0)
     parts.append(f"Session stats: main_answered={main_count}, followup_answered={follow_count}.")
 
     # Candidate metadata if present
@@ -760,30 +1187,51 @@ def _truncate_to_word_limit(text: str, max_words: int) -> str:
         return text
     return " ".join(words[:max_words]).rstrip()
 
-def generate_final_report_if_ready() -> Optional[str]:
+_REPORT_READINESS_PROJECTION: Dict[str, Any] = {"_id": 1, "main_questions_answered": 1, "followups_answered": 1}
+# The context covers the latest 3 question groups; 6 turns is enough to contain them.
+_REPORT_CONTEXT_PROJECTION: Dict[str, Any] = {
+    **_REPORT_READINESS_PROJECTION,
+    "meta": 1,
+    "turns": {"$slice": -6},
+}
+
+
+async def generate_final_report_if_ready() -> Optional[str]:
     """
     If the session has >=3 main answers and >=3 followups answered, call Gemini to generate final review,
     store it in session['final_report'] and session['summary'] and persist, and return the report text.
     If not ready, return None.
     """
-    session = _get_single_session_doc()
-    if not session:
+    # Called after every answer: check readiness on the counters alone and only load
+    # the report context (recent turns, meta) once it's ready.
+    counts = await get_active_session(_REPORT_READINESS_PROJECTION)
+    if not counts:
         return None
 
-    main_count = int(session.get("main_questions_answered", 0))
-    follow_count = int(session.get("followups_answered", 0))
+    main_count = counts.get("main_questions_answered", 0)
+    follow_count = counts.get("followups_answered", 0)
 
     # Only generate when both counts are >= 3
     if main_count < 3 or follow_count < 3:
         return None
 
+    session = await get_active_session(_REPORT_CONTEXT_PROJECTION)
+    if not session:
+        return None
+
     # Build context from session
     context = _build_final_context_from_session(session)
 
-    prompt = FINAL_REPORT_PROMPT.format(context=context)
+    prompt = _FINAL_REPORT_HEAD + context + _FINAL_REPORT_TAIL
 
     try:
-        raw = call_gemini(prompt=prompt, model="gemini-2.5-pro", max_tokens=800, temperature=0.0)
+        raw = await call_gemini(
+            prompt=prompt,
+            model="gemini-2.5-pro",
+            max_tokens=FINAL_REPORT_MAX_TOKENS,
+            temperature=0.0,
+            thinking_budget=FINAL_REPORT_THINKING_BUDGET,
+        )
         report = (raw or "").strip()
     except Exception as e:
         logger.exception("Final report Gemini call failed: %s", e)
@@ -792,15 +1240,18 @@ def generate_final_report_if_ready() -> Optional[str]:
     # Basic sanitation: ensure we do not include overly long text (truncate at ~400 words)
     report = _truncate_to_word_limit(report, 400)
 
-    # Save into session
+    # Save into session, along with a short summary (first 60-120 words)
     session_id = session.get("_id")
-    session["final_report"] = report
-    # Also store a short summary (first 60-120 words)
-    session["summary"] = _truncate_to_word_limit(report, 120)
-    session["last_activity_at"] = datetime.utcnow()
-
     try:
-        _update_session_doc(session_id, session)
+        _invalidate_session_cache()
+        await sessions_col.update_one(
+            {"_id": session_id},
+            {"$set": {
+                "final_report": report,
+                "summary": _truncate_to_word_limit(report, 120),
+                "last_activity_at": datetime.utcnow(),
+            }}
+        )
     except Exception:
         logger.exception("Failed to persist final_report into session (session_id=%s)", session_id)
 